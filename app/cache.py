@@ -0,0 +1,153 @@
+"""
+Cache layer for task reads.
+
+The task router reads single tasks through a cache backend and invalidates the
+affected keys after every write. Backends implement the small `CacheBackend`
+interface, so an out-of-process store (or a local stand-in for it in tests)
+can replace the in-process default.
+
+Classes:
+    CacheBackend: Interface every cache backend implements.
+    LRUTTLCache: In-process LRU cache with a per-entry time-to-live.
+
+Key components:
+    - `task_cache`: Process-wide task cache configured from the environment
+      (`TASK_CACHE_MAX_ENTRIES`, `TASK_CACHE_TTL_SECONDS`).
+    - `task_cache_key`: Builds the cache key of a task ID.
+"""
+
+import abc
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class CacheBackend(abc.ABC):
+    """
+    Interface of a cache backend.
+
+    Values are treated as opaque; `get` returns None for missing or expired keys.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value of `key`, or None."""
+
+    @abc.abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key`."""
+
+    @abc.abstractmethod
+    def delete(self, *keys: Hashable) -> None:
+        """Remove `keys` from the cache; missing keys are ignored."""
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+
+    @abc.abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the current size."""
+
+
+class LRUTTLCache(CacheBackend):
+    """
+    Thread-safe in-process cache with LRU eviction and a per-entry TTL.
+
+    Attributes:
+        max_entries (int): Capacity; the least recently used entry is evicted
+            beyond it. 0 disables caching.
+        ttl_seconds (float): Lifetime of an entry.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept.
+            ttl_seconds (float): Time-to-live of every entry in seconds.
+            clock (Callable[[], float]): Monotonic time source.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def delete(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                **self._counters,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+def task_cache_key(task_id: int) -> str:
+    """
+    Build the cache key of a task.
+
+    Args:
+        task_id (int): ID of the task.
+
+    Returns:
+        str: Namespaced key, usable by out-of-process backends as well.
+    """
+    return f"task:{task_id}"
+
+
+task_cache = LRUTTLCache(
+    max_entries=int(os.getenv("TASK_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("TASK_CACHE_TTL_SECONDS", "30")),
+)
@@ -0,0 +1,150 @@
+"""
+Group commit of concurrent single-row inserts.
+
+Every `POST /task/` used to run its own INSERT and COMMIT, so under many
+concurrent creates throughput was capped by the latency of one commit (one
+WAL flush each). The coalescer collects the inserts that arrive within a short
+window, or until a batch is full, writes them with one multi-row
+INSERT ... RETURNING in one transaction, and hands every caller its own row.
+One commit is then shared by the whole batch. (Where the driver cannot
+return the rows of a multi-row INSERT in parameter order, as with SQLite,
+SQLAlchemy sends one INSERT per row, still in the one transaction.)
+
+A failed batch fails every insert in it; the rows were validated by the
+request schema beforehand, so this only happens when the database itself
+rejects the write.
+
+Classes:
+    InsertCoalescer: Batches inserts into one model's table.
+
+Key components:
+    - `task_insert_coalescer`: Coalescer of the task table, or None when
+      `TASK_INSERT_COALESCING` is off (the default). Tuned with
+      `TASK_INSERT_MAX_BATCH_SIZE` (100) and `TASK_INSERT_MAX_DELAY_MS` (2).
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import insert, inspect
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from .database import AsyncSessionLocal
+from .models import Task
+
+load_dotenv()
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+# Values of one row and the future its caller waits on.
+_PendingInsert = Tuple[Dict[str, Any], asyncio.Future]
+
+
+class InsertCoalescer:  # pylint: disable=too-few-public-methods
+    """
+    Merges concurrent single-row inserts into multi-row INSERT statements.
+
+    The first insert of a batch starts a `max_delay` timer; the batch is
+    written when the timer fires or as soon as it holds `max_batch_size` rows,
+    whichever comes first. Batches are written concurrently, each in its own
+    transaction.
+
+    Attributes:
+        model (type): Mapped class whose table receives the rows.
+        session_factory (async_sessionmaker): Factory of the sessions writing
+            the batches; must not route to a replica.
+        max_batch_size (int): Maximum number of rows per INSERT.
+        max_delay (float): Seconds the first row of a batch may wait.
+    """
+
+    def __init__(
+        self,
+        model: type,
+        session_factory: async_sessionmaker,
+        max_batch_size: int = 100,
+        max_delay: float = 0.002,
+    ):
+        """
+        Initialize an idle coalescer.
+
+        Args:
+            model (type): Mapped class whose table receives the rows.
+            session_factory (async_sessionmaker): Factory of write sessions.
+            max_batch_size (int): Maximum number of rows per INSERT.
+            max_delay (float): Seconds the first row of a batch may wait.
+        """
+        self.model = model
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending: List[_PendingInsert] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writes: Set[asyncio.Task] = set()
+
+    async def insert(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Insert one row as part of the next batch.
+
+        Args:
+            values (dict): Column values of the row; every row of a batch must
+                set the same columns.
+
+        Returns:
+            dict: Every column of the stored row, generated ones included.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((values, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Start writing the pending rows as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            write = asyncio.ensure_future(self._write(batch))
+            # Keep a reference until the write is done; the loop only holds weak ones.
+            self._writes.add(write)
+            write.add_done_callback(self._writes.discard)
+
+    async def _write(self, batch: List[_PendingInsert]) -> None:
+        """Insert a batch in one transaction and resolve its callers."""
+        statement = insert(self.model).returning(
+            *inspect(self.model).local_table.columns, sort_by_parameter_order=True
+        )
+        try:
+            async with self.session_factory() as session:
+                rows = (
+                    await session.execute(statement, [values for values, _ in batch])
+                ).all()
+                await session.commit()
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future), row in zip(batch, rows):
+            # A caller that gave up (cancelled request) no longer waits.
+            if not future.done():
+                future.set_result(row._asdict())
+
+
+task_insert_coalescer = (
+    InsertCoalescer(
+        Task,
+        AsyncSessionLocal,
+        max_batch_size=int(os.getenv("TASK_INSERT_MAX_BATCH_SIZE", "100")),
+        max_delay=float(os.getenv("TASK_INSERT_MAX_DELAY_MS", "2")) / 1000,
+    )
+    if os.getenv("TASK_INSERT_COALESCING", "false").lower() in _TRUE_VALUES
+    else None
+)
@@ -7,26 +7,275 @@ creates a session factory for interacting with the database, and prepares the ba
 class for declarative models.
 
 Key components:
-- `engine`: SQLAlchemy engine connected to the database specified in the environment variables.
+- `engine`: SQLAlchemy engine connected to the database specified in the environment variables,
+  taken from the shared, pool-tuned engine registry in `core.db.base_db`.
 - `SessionLocal`: Factory for creating database sessions.
+- `async_engine`: asyncio engine for the same database (asyncpg / aiosqlite driver).
+- `AsyncSessionLocal`: Factory for creating `AsyncSession` objects used by the API; its
+  sessions are `RoutingSession`s that can read from a replica.
+- `replica_pool`: Optional read replicas from `DATABASE_REPLICA_URLS`, with a lag check.
+- `session_scope`: Opens an API session, routed to a replica when it is read-only.
 - `Base`: Declarative base class with an explicit schema set to 'public' for model definitions.
 """
 
+import asyncio
+import logging
 import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+
+from core.db.base_db import get_async_engine, get_engine
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> URL:
+    """
+    Translate a database URL to the matching asyncio driver.
+
+    `postgresql://` / `postgresql+psycopg2://` become `postgresql+asyncpg://` and
+    `sqlite://` becomes `sqlite+aiosqlite://`. URLs that already name an asyncio
+    driver are returned unchanged.
+
+    Args:
+        url (str): Database URL, usually the synchronous one from the environment.
+
+    Returns:
+        URL: The URL with an asyncio driver.
+    """
+    parsed = make_url(url)
+    if parsed.get_dialect().is_async:
+        return parsed
+
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No asyncio driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def engine_options(url: str | URL) -> Dict[str, Any]:
+    """
+    Dialect specific keyword arguments for `create_engine` / `create_async_engine`.
+
+    SQLite has no schemas, so the 'public' schema of the models is mapped to the
+    default database there. This lets the test suite run on (aio)sqlite.
+
+    Args:
+        url (str | URL): Database URL.
+
+    Returns:
+        dict: Extra engine keyword arguments.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"execution_options": {"schema_translate_map": {"public": None}}}
+    return {}
+
+
 db_url = os.getenv("DATABASE_URL")
 if db_url is None:
     raise RuntimeError("DATABASE_URL environment variable is not set")
 
-engine = create_engine(db_url)
+engine = get_engine(db_url, **engine_options(db_url))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = get_async_engine(to_async_url(db_url), **engine_options(db_url))
+
+
+class RoutingSession(Session):  # pylint: disable=too-few-public-methods
+    """
+    Session that sends the reads of a read-only session to a replica.
+
+    A replica engine stored in `session.info["replica"]` is used for every
+    SELECT. Flushes and INSERT / UPDATE / DELETE statements always go to the
+    primary, so an accidental write in a read-only session cannot reach a
+    replica. A read that must see the latest committed data passes
+    `bind_arguments={"primary": True}`.
+    """
+
+    def get_bind(self, mapper=None, *, clause=None, primary=False, **kwargs):
+        """
+        Return the replica for reads of a read-only session, else the primary.
+
+        Args:
+            mapper: Mapper of the entity involved, if any.
+            clause: Statement about to be executed, if any.
+            primary (bool): Read from the primary even in a read-only session.
+            **kwargs: Remaining `Session.get_bind` arguments.
+
+        Returns:
+            The engine to execute on.
+        """
+        replica = self.info.get("replica")
+        if (
+            replica is not None
+            and not primary
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+        ):
+            return replica
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+# Seconds a streaming replica is behind the primary; 0 when it has replayed
+# everything it received (an idle primary does not make the replica "lag").
+POSTGRES_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class ReplicaPool:  # pylint: disable=too-many-instance-attributes
+    """
+    Read replicas picked round-robin, skipping those that lag too far behind.
+
+    Replication lag is measured at most once per `check_interval` seconds per
+    replica, and concurrent sessions share the measurement in flight instead of
+    each querying the replica. A replica that cannot be reached, or does not
+    answer within `check_timeout` seconds, counts as lagging.
+
+    Attributes:
+        engines (list[AsyncEngine]): Replica engines.
+        max_lag (float): Highest accepted lag in seconds.
+        check_interval (float): Seconds a lag measurement is reused.
+        check_timeout (float): Seconds a lag measurement may take.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        engines: Sequence[AsyncEngine],
+        max_lag: float = 5.0,
+        check_interval: float = 5.0,
+        check_timeout: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.engines = list(engines)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._clock = clock
+        self._next = 0
+        # Per replica index: (time of the check, healthy).
+        self._checks: Dict[int, Tuple[float, bool]] = {}
+        # Per replica index: the lag check in progress.
+        self._in_flight: Dict[int, asyncio.Future] = {}
+
+    async def lag(self, replica: AsyncEngine) -> float:
+        """
+        Measure the replication lag of a replica.
+
+        Args:
+            replica (AsyncEngine): Replica to query.
+
+        Returns:
+            float: Lag in seconds; 0 for databases without streaming replication.
+        """
+        if replica.dialect.name != "postgresql":
+            return 0.0
+        async with replica.connect() as conn:
+            return float((await conn.execute(POSTGRES_REPLICA_LAG_SQL)).scalar_one())
+
+    async def _healthy(self, index: int) -> bool:
+        checked = self._checks.get(index)
+        if checked is not None and self._clock() - checked[0] < self.check_interval:
+            return checked[1]
+
+        check = self._in_flight.get(index)
+        if check is None:
+            check = asyncio.ensure_future(self._check(index))
+            self._in_flight[index] = check
+            check.add_done_callback(lambda _: self._in_flight.pop(index, None))
+        # A cancelled session must not cancel the check the others wait on.
+        return await asyncio.shield(check)
+
+    async def _check(self, index: int) -> bool:
+        now = self._clock()
+        try:
+            lag = await asyncio.wait_for(
+                self.lag(self.engines[index]), self.check_timeout
+            )
+            healthy = lag <= self.max_lag
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Replica %d lag check failed: %r", index, e)
+            healthy = False
+        self._checks[index] = (now, healthy)
+        return healthy
+
+    async def pick(self) -> Optional[AsyncEngine]:
+        """
+        Choose the replica for the next read-only session.
+
+        Returns:
+            AsyncEngine | None: A healthy replica, or None to use the primary.
+        """
+        for _ in range(len(self.engines)):
+            index = self._next
+            self._next = (index + 1) % len(self.engines)
+            if await self._healthy(index):
+                return self.engines[index]
+        return None
+
+
+def _replica_engines(urls: Optional[str]) -> List[AsyncEngine]:
+    """Shared asyncio engines of the comma-separated replica URLs."""
+    replica_urls = [url.strip() for url in (urls or "").split(",") if url.strip()]
+    return [
+        get_async_engine(to_async_url(url), **engine_options(url))
+        for url in replica_urls
+    ]
+
+
+replica_pool = ReplicaPool(
+    _replica_engines(os.getenv("DATABASE_REPLICA_URLS")),
+    max_lag=float(os.getenv("DATABASE_REPLICA_MAX_LAG_SECONDS", "5")),
+    check_interval=float(os.getenv("DATABASE_REPLICA_CHECK_INTERVAL_SECONDS", "5")),
+    check_timeout=float(os.getenv("DATABASE_REPLICA_CHECK_TIMEOUT_SECONDS", "1")),
+)
+
+AsyncSessionLocal = async_sessionmaker(  # pylint: disable=invalid-name
+    async_engine,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+@asynccontextmanager
+async def session_scope(read_only: bool = False) -> AsyncIterator[AsyncSession]:
+    """
+    Open an API session, reading from a replica when possible.
+
+    Read-only sessions use a healthy replica from `replica_pool`; without
+    replicas, or when all of them lag, they use the primary like any other
+    session.
+
+    Args:
+        read_only (bool): Whether the session only reads.
+
+    Yields:
+        AsyncSession: The database session.
+    """
+    replica = await replica_pool.pick() if read_only else None
+    info = {"replica": replica.sync_engine} if replica is not None else {}
+    async with AsyncSessionLocal(info=info) as session:
+        yield session
+
+
 Base = declarative_base(metadata=MetaData(schema="public"))
@@ -0,0 +1,84 @@
+"""
+Entity tags for conditional GET requests on task resources.
+
+Task rows carry a version that every UPDATE increments, so strong ETags can be
+derived from IDs and versions alone, without serializing the response body.
+
+Functions:
+    task_etag: ETag of a single task.
+    task_page_etag: ETag of a page of the task list.
+    etag_matches: Evaluate an If-None-Match header against an ETag.
+"""
+
+import hashlib
+from typing import Iterable, Sequence, Tuple
+
+
+def task_etag(task_id: int, version: int, fields: Sequence[str] | None = None) -> str:
+    """
+    Build the strong ETag of a single task.
+
+    Args:
+        task_id (int): ID of the task.
+        version (int): Row version of the task.
+        fields (Sequence[str] | None): Fields of a projected representation;
+            None for the full task.
+
+    Returns:
+        str: Quoted entity tag.
+    """
+    if fields is None:
+        return f'"task-{task_id}-v{version}"'
+    projection = "+".join(fields)
+    return f'"task-{task_id}-v{version}-{projection}"'
+
+
+def task_page_etag(
+    rows: Iterable[Tuple[int, int]],
+    next_cursor: int | None,
+    fields: Sequence[str] | None = None,
+) -> str:
+    """
+    Build the strong ETag of a page of the task list.
+
+    The tag is a digest of the (id, version) pairs of the page and its cursor,
+    so it changes whenever a task of the page is added, updated or removed.
+
+    Args:
+        rows (Iterable[Tuple[int, int]]): (id, version) of every task on the page.
+        next_cursor (int | None): Cursor of the following page.
+        fields (Sequence[str] | None): Fields of a projected representation;
+            None for full tasks.
+
+    Returns:
+        str: Quoted entity tag.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for task_id, version in rows:
+        digest.update(f"{task_id}:{version};".encode())
+    digest.update(f"next:{next_cursor}".encode())
+    if fields is not None:
+        digest.update(f"fields:{','.join(fields)}".encode())
+    return f'"tasks-{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check whether an If-None-Match header matches an ETag.
+
+    Uses the weak comparison that RFC 9110 prescribes for If-None-Match, so
+    `W/"x"` matches `"x"`.
+
+    Args:
+        if_none_match (str | None): Raw header value.
+        etag (str): Current entity tag of the resource.
+
+    Returns:
+        bool: True if the client's cached representation is still current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
@@ -0,0 +1,90 @@
+"""
+Streaming encoders for task exports.
+
+The encoders consume task rows in batches (as produced by a server-side cursor)
+and yield one text chunk per batch, so an export never holds more than one
+batch in memory and the first bytes can be sent as soon as the first batch
+arrives.
+
+Functions:
+    export_fields: Column names written by the exporters.
+    iter_ndjson: Encode batches of tasks as newline-delimited JSON.
+    iter_csv: Encode batches of tasks as CSV with a header row.
+"""
+
+import csv
+import datetime
+import enum
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+from .models import Task
+
+
+def export_fields() -> List[str]:
+    """
+    Column names written by the exporters, in table order.
+
+    Returns:
+        list[str]: Column keys of the task table, without internal ones.
+    """
+    return [
+        column.key
+        for column in Task.__table__.columns
+        if not column.info.get("internal")
+    ]
+
+
+def _plain_value(value: Any) -> Any:
+    """Convert enums and dates to their JSON / CSV representation."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+
+def _plain_row(task: Task, fields: List[str]) -> Dict[str, Any]:
+    return {field: _plain_value(getattr(task, field)) for field in fields}
+
+
+async def iter_ndjson(batches: AsyncIterator[Sequence[Task]]) -> AsyncIterator[str]:
+    """
+    Encode batches of tasks as newline-delimited JSON.
+
+    Args:
+        batches (AsyncIterator[Sequence[Task]]): Task rows, batch by batch.
+
+    Yields:
+        str: One JSON document per line, one chunk per batch.
+    """
+    fields = export_fields()
+    async for batch in batches:
+        yield "".join(
+            json.dumps(_plain_row(task, fields), separators=(",", ":")) + "\n"
+            for task in batch
+        )
+
+
+async def iter_csv(batches: AsyncIterator[Sequence[Task]]) -> AsyncIterator[str]:
+    """
+    Encode batches of tasks as CSV.
+
+    Args:
+        batches (AsyncIterator[Sequence[Task]]): Task rows, batch by batch.
+
+    Yields:
+        str: The header row first, then one chunk of rows per batch.
+    """
+    fields = export_fields()
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_plain_row(task, fields) for task in batch)
+        yield buffer.getvalue()
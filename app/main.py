@@ -10,21 +10,70 @@ are organized in separate modules and are included here.
 
 Key components:
 - FastAPI instance `app` with metadata and middleware setup.
-- Middleware: Adds process time header and logs incoming requests.
+- Lifespan: Disposes the shared database connection pools on shutdown.
+- Middleware: A pure ASGI middleware adds the process time header and logs
+  incoming requests; a second one caps concurrent requests per route class and
+  sheds the excess with 503; a third one compresses large responses (brotli/gzip).
 - Health check endpoint: Provides a simple endpoint to verify service availability.
+- Metrics endpoint: Request, connection pool and cache metrics in Prometheus format.
 - Routers: API routes defined in modular files (e.g., task router).
 """
 
-from fastapi import FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware
+from contextlib import asynccontextmanager
 
-from .middleware import add_process_time_header, log_requests
+from fastapi import FastAPI, Response
+
+from core.db.base_db import dispose_async_engines, dispose_engines
+
+from .cache import task_cache
+from .database import async_engine, engine, replica_pool
+from .metrics import (
+    CONTENT_TYPE,
+    register_cache_metrics,
+    register_pool_metrics,
+    registry,
+)
+from .middleware import (
+    CompressionMiddleware,
+    ConcurrencyLimitMiddleware,
+    RequestTimingMiddleware,
+)
 from .routers import task
 
-app = FastAPI()
 
-app.add_middleware(BaseHTTPMiddleware, dispatch=add_process_time_header)
-app.add_middleware(BaseHTTPMiddleware, dispatch=log_requests)
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """
+    Application lifespan: close pooled database connections on shutdown.
+
+    Args:
+        _app (FastAPI): The application instance.
+    """
+    yield
+    await dispose_async_engines()
+    dispose_engines()
+
+
+app = FastAPI(lifespan=lifespan)
+
+register_pool_metrics(
+    registry,
+    {
+        "async": async_engine.sync_engine,
+        "sync": engine,
+        **{
+            f"replica-{index}": replica.sync_engine
+            for index, replica in enumerate(replica_pool.engines)
+        },
+    },
+)
+register_cache_metrics(registry, "task", task_cache)
+
+# The last middleware added runs first. The limiter and compression run inside
+# the timing middleware, so shed requests are still logged and counted.
+app.add_middleware(ConcurrencyLimitMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(RequestTimingMiddleware)
 
 
 @app.get("/healthy")
@@ -38,4 +87,15 @@ def health_check():
     return {"status": "Healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Metrics endpoint for Prometheus scrapers.
+
+    Returns:
+        Response: All registered metrics in the Prometheus text format.
+    """
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
 app.include_router(task.router)
@@ -0,0 +1,400 @@
+"""
+In-process metrics registry rendered in the Prometheus text format.
+
+The registry keeps counters, gauges and histograms in memory and renders them
+on demand for the `/metrics` endpoint, so request latency and connection pool
+saturation can be scraped without an external APM agent. Values that already
+live elsewhere (pool state, cache counters) are read at scrape time through
+collectors instead of being duplicated.
+
+Classes:
+    Counter: Monotonically increasing value per label set.
+    Gauge: Value per label set that can go up and down.
+    Histogram: Bucketed observations per label set.
+    MetricsRegistry: Holds metrics and collectors and renders them.
+
+Key components:
+    - `registry`: Process-wide registry used by the application.
+    - `http_requests_total`, `http_request_duration_seconds`,
+      `http_requests_in_progress`: HTTP metrics recorded by the request middleware.
+    - `http_requests_shed_total`, `http_requests_queued`: Load shedding metrics
+      recorded by the concurrency limit middleware.
+    - `register_pool_metrics`: Exposes SQLAlchemy connection pool statistics.
+    - `register_cache_metrics`: Exposes the counters of a cache backend.
+"""
+
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .cache import CacheBackend
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Dict[str, str]
+Sample = Tuple[str, Labels, float]
+# (name, type, help, samples) of one metric family.
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:  # pylint: disable=too-few-public-methods
+    """
+    Common base of the metric types.
+
+    Attributes:
+        name (str): Metric name.
+        documentation (str): HELP text.
+        labelnames (tuple[str, ...]): Names of the labels, in order.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Labels:
+        return dict(zip(self.labelnames, key))
+
+    def collect(self) -> Family:
+        """Return the metric family with its current samples."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """
+        Increase the counter of a label set.
+
+        Args:
+            amount (float): Non-negative increment.
+            **labels (str): Label values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> Family:
+        with self._lock:
+            samples = [
+                (self.name, self._labels(key), value)
+                for key, value in self._values.items()
+            ]
+        return self.name, self.type_name, self.documentation, samples
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down."""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        """
+        Decrease the gauge of a label set.
+
+        Args:
+            amount (float): Decrement.
+            **labels (str): Label values.
+        """
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        """
+        Set the gauge of a label set.
+
+        Args:
+            value (float): New value.
+            **labels (str): Label values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    Bucketed observations per label set.
+
+    Attributes:
+        buckets (tuple[float, ...]): Upper bounds of the buckets, ascending.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (+Inf last), sum, count.
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value (float): Observed value, e.g. a duration in seconds.
+            **labels (str): Label values.
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, totals = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+            )
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def collect(self) -> Family:
+        samples: List[Sample] = []
+        with self._lock:
+            for key, (counts, (total, count)) in self._values.items():
+                labels = self._labels(key)
+                cumulative = 0
+                for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                    cumulative += bucket_count
+                    samples.append(
+                        (
+                            f"{self.name}_bucket",
+                            {**labels, "le": _format_value(bound)},
+                            cumulative,
+                        )
+                    )
+                samples.append((f"{self.name}_sum", labels, total))
+                samples.append((f"{self.name}_count", labels, count))
+        return self.name, self.type_name, self.documentation, samples
+
+
+class MetricsRegistry:
+    """
+    Holds metrics and scrape-time collectors and renders them.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """Create and register a counter."""
+        metric = Counter(name, documentation, labelnames)
+        self._register(metric)
+        return metric
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        """Create and register a gauge."""
+        metric = Gauge(name, documentation, labelnames)
+        self._register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._register(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """
+        Register a callable that produces metric families at scrape time.
+
+        Args:
+            collector (Callable): Returns (name, type, help, samples) tuples.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition, ending with a newline.
+        """
+        with self._lock:
+            families = [metric.collect() for metric in self._metrics.values()]
+            collectors = list(self._collectors)
+        for collector in collectors:
+            families.extend(collector())
+
+        lines = []
+        for name, type_name, documentation, samples in families:
+            lines.append(f"# HELP {name} {_escape(documentation)}")
+            lines.append(f"# TYPE {name} {type_name}")
+            for sample_name, labels, value in samples:
+                if labels:
+                    label_text = ",".join(
+                        f'{key}="{_escape(str(val))}"' for key, val in labels.items()
+                    )
+                    sample_name = f"{sample_name}{{{label_text}}}"
+                lines.append(f"{sample_name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "Time until the response started, by method and route template.",
+    ("method", "route"),
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being processed, by method.",
+    ("method",),
+)
+http_requests_shed_total = registry.counter(
+    "http_requests_shed_total",
+    "Requests rejected with 503 by the concurrency limit, by route class and reason.",
+    ("route_class", "reason"),
+)
+http_requests_queued = registry.gauge(
+    "http_requests_queued",
+    "Requests waiting for a concurrency slot, by route class.",
+    ("route_class",),
+)
+
+
+def register_pool_metrics(
+    metrics_registry: MetricsRegistry, engines: Dict[str, Engine]
+) -> None:
+    """
+    Expose the connection pool statistics of SQLAlchemy engines.
+
+    Pool size, checked-out and overflow connections are read at scrape time
+    (for pools that track them); checkouts and new connections are counted
+    through pool events.
+
+    Args:
+        metrics_registry (MetricsRegistry): Registry to extend.
+        engines (dict[str, Engine]): Engines by label value; pass
+            `AsyncEngine.sync_engine` for asyncio engines.
+    """
+    checkouts = metrics_registry.counter(
+        "db_pool_checkouts_total", "Connections checked out of the pool.", ("engine",)
+    )
+    connects = metrics_registry.counter(
+        "db_pool_connections_created_total",
+        "New DBAPI connections opened by the pool.",
+        ("engine",),
+    )
+
+    for label, engine in engines.items():
+        event.listen(
+            engine.pool,
+            "checkout",
+            lambda *_args, _label=label: checkouts.inc(engine=_label),
+        )
+        event.listen(
+            engine.pool,
+            "connect",
+            lambda *_args, _label=label: connects.inc(engine=_label),
+        )
+
+    gauges = {
+        "db_pool_size": ("size", "Configured number of pooled connections."),
+        "db_pool_checked_out": ("checkedout", "Connections currently in use."),
+        "db_pool_checked_in": ("checkedin", "Idle connections in the pool."),
+        "db_pool_overflow": ("overflow", "Connections open beyond the pool size."),
+    }
+
+    def collect() -> Iterable[Family]:
+        for name, (method, documentation) in gauges.items():
+            samples: List[Sample] = []
+            for label, engine in engines.items():
+                reader = getattr(engine.pool, method, None)
+                if callable(reader):
+                    value = reader()
+                    if method == "overflow":
+                        # QueuePool counts from -pool_size until the pool is full.
+                        value = max(0, value)
+                    samples.append((name, {"engine": label}, value))
+            yield name, "gauge", documentation, samples
+
+    metrics_registry.register_collector(collect)
+
+
+def register_cache_metrics(
+    metrics_registry: MetricsRegistry, name: str, cache: CacheBackend
+) -> None:
+    """
+    Expose the counters and size of a cache backend.
+
+    Args:
+        metrics_registry (MetricsRegistry): Registry to extend.
+        name (str): Value of the `cache` label.
+        cache (CacheBackend): Cache whose `stats()` are reported.
+    """
+
+    def collect() -> Iterable[Family]:
+        stats = cache.stats()
+        for key, value in stats.items():
+            is_counter = key in ("hits", "misses", "evictions", "expirations")
+            metric_name = f"cache_{key}_total" if is_counter else f"cache_{key}"
+            yield (
+                metric_name,
+                "counter" if is_counter else "gauge",
+                f"Cache {key.replace('_', ' ')}.",
+                [(metric_name, {"cache": name}, value)],
+            )
+
+    metrics_registry.register_collector(collect)
@@ -1,84 +1,649 @@
 """
 Middleware utilities for FastAPI application.
 
-This module provides middleware functions for:
-    - Adding the X-Process-Time header to responses, indicating request processing time.
-    - Logging incoming HTTP requests and their completion status.
+This module provides three pure ASGI middlewares.
+
+`RequestTimingMiddleware`, in a single pass:
+    - Adds the X-Process-Time header to responses, indicating request processing time.
+    - Logs incoming HTTP requests and their completion status.
+    - Records request counts, latency and in-flight requests in `app.metrics`.
+    - Opens a `query_scope` per request when database instrumentation is enabled,
+      so slow statements and repeated statement shapes are attributed to it.
+
+Unlike `BaseHTTPMiddleware` it does not wrap the response in extra tasks and
+memory streams, so streaming responses pass through untouched. Log records are
+handed to a `QueueHandler`; a `QueueListener` thread does the actual I/O so the
+event loop never blocks on a log write.
+
+`ConcurrencyLimitMiddleware` caps the requests in flight per route class
+(reads and writes). Requests beyond the cap wait in a bounded queue for a
+bounded time; when the queue is full or the wait times out the request is shed
+with 503 and `Retry-After`, so a traffic spike degrades a few requests instead
+of draining the database pool and slowing every request down.
+
+`CompressionMiddleware` compresses responses with brotli or gzip, as negotiated
+by `Accept-Encoding`, once a body reaches a minimum size. Streaming bodies are
+compressed chunk by chunk and flushed, so they keep streaming.
 
 Requires:
-    - FastAPI
+    - Starlette
     - Python logging
+    - brotli (optional; without it only gzip is offered)
 """
 
+import asyncio
+import atexit
+import collections
+import contextlib
+import json
 import logging
+import os
+import queue
 import time
-from datetime import datetime
+import zlib
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Deque, Dict, List, Optional, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.db import instrumentation
+
+try:
+    import brotli  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
 
-from fastapi import Request
+from .metrics import (
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    http_requests_queued,
+    http_requests_shed_total,
+    http_requests_total,
+)
+
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 )
+log_listener = QueueListener(log_queue, _stream_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(QueueHandler(log_queue))
+logger.propagate = False
+
+
+def _route_template(scope: Scope) -> str:
+    """Path template of the matched route; keeps metric label cardinality bounded."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestTimingMiddleware:  # pylint: disable=too-few-public-methods
+    """
+    ASGI middleware that times and logs every HTTP request.
+
+    The clock is read once when the request arrives and once when the response
+    starts; the difference is sent as X-Process-Time, logged, and recorded in
+    the latency histogram of the request's route template.
+
+    Attributes:
+        app (ASGIApp): The wrapped ASGI application.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The next middleware or the application.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handle one ASGI connection.
+
+        Args:
+            scope (Scope): ASGI connection scope.
+            receive (Receive): ASGI receive channel.
+            send (Send): ASGI send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        client_host = client[0] if client else "unknown"
+
+        logger.info(
+            "Incoming request - Method: %s, Path: %s, Query: %s, Client: %s",
+            method,
+            path,
+            dict(QueryParams(scope.get("query_string", b""))),
+            client_host,
+        )
+
+        response_started = False
+
+        def record(status_code: int, process_time: float) -> None:
+            route = _route_template(scope)
+            http_requests_total.inc(method=method, route=route, status=str(status_code))
+            http_request_duration_seconds.observe(
+                process_time, method=method, route=route
+            )
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                process_time = time.perf_counter() - start_time
+                record(message["status"], process_time)
+                MutableHeaders(scope=message).append(
+                    "X-Process-Time", str(process_time)
+                )
+                logger.info(
+                    "Request completed - Method: %s, Path: %s, Status: %s, "
+                    "Duration: %.2fms",
+                    method,
+                    path,
+                    message["status"],
+                    process_time * 1000,
+                )
+            await send(message)
 
+        query_scope = (
+            instrumentation.query_scope(f"{method} {path}")
+            if instrumentation.ENABLED
+            else contextlib.nullcontext()
+        )
 
-async def add_process_time_header(request: Request, call_next):
+        http_requests_in_progress.inc(method=method)
+        try:
+            with query_scope:
+                await self.app(scope, receive, send_with_timing)
+        except Exception as e:
+            logger.error("Request error: %s", str(e))
+            if not response_started:
+                record(500, time.perf_counter() - start_time)
+            raise
+        finally:
+            http_requests_in_progress.dec(method=method)
+
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+UNLIMITED_PATHS = frozenset({"/healthy", "/metrics"})
+
+
+def route_class(scope: Scope) -> Optional[str]:
     """
-    Middleware to add the X-Process-Time header to the response.
+    Route class a request is limited under.
 
     Args:
-        request (Request): The incoming HTTP request.
-        call_next (Callable): The next middleware or route handler.
+        scope (Scope): ASGI connection scope.
 
     Returns:
-        Response: The HTTP response with the X-Process-Time header.
+        str | None: "read" or "write"; None for probes that must never be shed.
+    """
+    if scope["path"] in UNLIMITED_PATHS:
+        return None
+    return "read" if scope["method"] in READ_METHODS else "write"
+
+
+@dataclass(frozen=True)
+class ConcurrencyLimit:
+    """
+    Limits of one route class.
+
+    Attributes:
+        max_concurrent (int): Requests processed at once; 0 or less disables the limit.
+        max_queued (int): Requests allowed to wait for a slot.
+        queue_timeout (float): Seconds a request waits for a slot before it is shed.
+    """
+
+    max_concurrent: int
+    max_queued: int
+    queue_timeout: float
+
+
+def limits_from_env() -> Dict[str, ConcurrencyLimit]:
+    """
+    Limits of the read and write route classes from the environment.
+
+    Keep the sum of the concurrency limits close to the database pool size
+    (DB_POOL_SIZE + DB_MAX_OVERFLOW) so admitted requests rarely wait for a
+    connection.
+
+    Returns:
+        dict[str, ConcurrencyLimit]: Limits by route class.
+    """
+    max_queued = int(os.getenv("CONCURRENCY_QUEUE_SIZE", "50"))
+    queue_timeout = float(os.getenv("CONCURRENCY_QUEUE_TIMEOUT_SECONDS", "2"))
+    return {
+        "read": ConcurrencyLimit(
+            int(os.getenv("READ_CONCURRENCY_LIMIT", "10")), max_queued, queue_timeout
+        ),
+        "write": ConcurrencyLimit(
+            int(os.getenv("WRITE_CONCURRENCY_LIMIT", "5")), max_queued, queue_timeout
+        ),
+    }
+
+
+class _Slots:
+    """
+    Concurrency slots of one route class with a FIFO queue of waiters.
+
+    A released slot is handed directly to the oldest waiter, so queued requests
+    are served in arrival order and new arrivals cannot overtake them.
+    """
+
+    def __init__(self, name: str, limit: ConcurrencyLimit):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = collections.deque()
+
+    async def acquire(self) -> Optional[str]:
+        """
+        Take a slot, waiting in the queue if needed.
+
+        Returns:
+            str | None: None once a slot is held, else why the request is shed
+            ("queue_full" or "queue_timeout").
+        """
+        if self.active < self.limit.max_concurrent and not self.waiters:
+            self.active += 1
+            return None
+        if len(self.waiters) >= self.limit.max_queued:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        http_requests_queued.inc(route_class=self.name)
+        try:
+            await asyncio.wait({waiter}, timeout=self.limit.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        finally:
+            http_requests_queued.dec(route_class=self.name)
+        if waiter.done():
+            return None
+        self._abandon(waiter)
+        return "queue_timeout"
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done():
+            # The slot was handed over while the request gave up; pass it on.
+            self.release()
+        else:
+            self.waiters.remove(waiter)
+            waiter.cancel()
+
+    def release(self) -> None:
+        """Hand the slot to the oldest waiter, or free it."""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class ConcurrencyLimitMiddleware:  # pylint: disable=too-few-public-methods
     """
-    start_time = time.perf_counter()
-    response = await call_next(request)
-    process_time = time.perf_counter() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+    ASGI middleware that caps concurrent requests per route class.
+
+    Attributes:
+        app (ASGIApp): The wrapped ASGI application.
+        retry_after (int): Value of the Retry-After header of shed requests, in seconds.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: Optional[Dict[str, ConcurrencyLimit]] = None,
+        classify: Callable[[Scope], Optional[str]] = route_class,
+        retry_after: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The next middleware or the application.
+            limits (dict[str, ConcurrencyLimit] | None): Limits by route class;
+                read from the environment by default.
+            classify (Callable): Maps a request scope to its route class, or to
+                None for requests that are never limited.
+            retry_after (int | None): Retry-After seconds; defaults to
+                CONCURRENCY_RETRY_AFTER_SECONDS or 1.
+        """
+        self.app = app
+        self.classify = classify
+        self.retry_after = (
+            retry_after
+            if retry_after is not None
+            else int(os.getenv("CONCURRENCY_RETRY_AFTER_SECONDS", "1"))
+        )
+        self._slots = {
+            name: _Slots(name, limit)
+            for name, limit in (limits or limits_from_env()).items()
+            if limit.max_concurrent > 0
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handle one ASGI connection.
+
+        Args:
+            scope (Scope): ASGI connection scope.
+            receive (Receive): ASGI receive channel.
+            send (Send): ASGI send channel.
+        """
+        name = self.classify(scope) if scope["type"] == "http" else None
+        slots = self._slots.get(name) if name is not None else None
+        if slots is None:
+            await self.app(scope, receive, send)
+            return
+
+        shed_reason = await slots.acquire()
+        if shed_reason is not None:
+            http_requests_shed_total.inc(route_class=slots.name, reason=shed_reason)
+            await self._reject(send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            slots.release()
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({"detail": "Server is busy, retry later"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+COMPRESSIBLE_TYPES = frozenset(
+    {
+        "application/json",
+        "application/x-ndjson",
+        "application/javascript",
+        "application/xml",
+    }
+)
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk, returning what is ready to send."""
+
+    def flush(self) -> bytes:
+        """Return everything buffered so far, keeping the stream open."""
+
+    def finish(self) -> bytes:
+        """Return the remaining data and end the stream."""
+
+
+class _GzipCompressor(_Compressor):
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor(_Compressor):
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(
+            mode=brotli.MODE_TEXT, quality=quality, lgwin=22
+        )
 
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
 
-async def log_requests(request: Request, call_next):
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def negotiate_encoding(accept_encoding: str, offered: List[str]) -> Optional[str]:
     """
-    Middleware to log details about each HTTP request and its response.
+    Pick the content coding for a response.
 
     Args:
-        request (Request): The incoming HTTP request.
-        call_next (Callable): The next middleware or route handler.
+        accept_encoding (str): Value of the request's Accept-Encoding header.
+        offered (list[str]): Codings the server can produce, preferred first.
 
     Returns:
-        Response: The HTTP response after logging request and response details.
+        str | None: The accepted coding with the highest q-value (ties go to
+        the server's preference), or None to send the body as is.
     """
-    start_time = datetime.now()
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.strip()] = weight
 
-    method = request.method
-    path = request.url.path
-    query_params = dict(request.query_params)
-    client_host = request.client.host if request.client else "unknown"
+    best, best_weight = None, 0.0
+    for coding in offered:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
 
-    logger.info(
-        "Incoming request - Method: %s, Path: %s, Query: %s, Client: %s",
-        method,
-        path,
-        query_params,
-        client_host,
-    )
 
-    try:
-        response = await call_next(request)
-    except Exception as e:
-        logger.error("Request error: %s", str(e))
-        raise
-
-    process_time = (datetime.now() - start_time).total_seconds() * 1000
-    logger.info(
-        "Request completed - Method: %s, Path: %s, Status: %s, Duration: %.2fms",
-        method,
-        path,
-        response.status_code,
-        process_time,
+def _is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return (
+        content_type.startswith("text/")
+        or content_type in COMPRESSIBLE_TYPES
+        or content_type.endswith("+json")
     )
 
-    return response
+
+class CompressionMiddleware:  # pylint: disable=too-few-public-methods
+    """
+    ASGI middleware compressing responses with brotli or gzip.
+
+    Bodies smaller than `minimum_size` are sent unchanged, as are bodies that
+    are not text-like or already encoded. Compressed responses get
+    `Content-Encoding`, `Vary: Accept-Encoding`, and a weak ETag, since the bytes
+    differ from the identity representation.
+
+    Attributes:
+        app (ASGIApp): The wrapped ASGI application.
+        minimum_size (int): Smallest body, in bytes, that is compressed.
+        gzip_level (int): zlib compression level, 1-9.
+        brotli_quality (int): Brotli quality, 0-11.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        gzip_level: Optional[int] = None,
+        brotli_quality: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the middleware.
+
+        Defaults come from COMPRESSION_MINIMUM_SIZE (1024), GZIP_LEVEL (5) and
+        BROTLI_QUALITY (4): fast levels that keep most of the size reduction
+        of the maximum levels at a fraction of their CPU time
+        (see `benchmarks.compression`).
+
+        Args:
+            app (ASGIApp): The next middleware or the application.
+            minimum_size (int | None): Smallest body that is compressed.
+            gzip_level (int | None): zlib compression level.
+            brotli_quality (int | None): Brotli quality.
+        """
+        self.app = app
+        self.minimum_size = (
+            minimum_size
+            if minimum_size is not None
+            else int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+        )
+        self.gzip_level = (
+            gzip_level if gzip_level is not None else int(os.getenv("GZIP_LEVEL", "5"))
+        )
+        self.brotli_quality = (
+            brotli_quality
+            if brotli_quality is not None
+            else int(os.getenv("BROTLI_QUALITY", "4"))
+        )
+        self.offered = (["br"] if brotli is not None else []) + ["gzip"]
+
+    def _compressor(self, encoding: str) -> _Compressor:
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handle one ASGI connection.
+
+        Args:
+            scope (Scope): ASGI connection scope.
+            receive (Receive): ASGI receive channel.
+            send (Send): ASGI send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.offered
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(
+            send, self._compressor(encoding), encoding, self.minimum_size
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:  # pylint: disable=too-few-public-methods
+    """
+    Send channel of one response that compresses the body on the way out.
+
+    The start message is held back until enough of the body has arrived to
+    decide whether to compress it.
+    """
+
+    def __init__(
+        self, send: Send, compressor: _Compressor, encoding: str, minimum_size: int
+    ):
+        self._send = send
+        self._compressor = compressor
+        self._encoding = encoding
+        self._minimum_size = minimum_size
+        self._start: Optional[Message] = None
+        self._pending: List[bytes] = []
+        # "collect" until the body is big enough, then "compress" or "passthrough".
+        self._mode = "collect"
+
+    async def send(self, message: Message) -> None:
+        """
+        Forward one ASGI message, compressing response bodies.
+
+        Args:
+            message (Message): Message sent by the application.
+        """
+        if self._mode == "passthrough":
+            await self._send(message)
+        elif message["type"] == "http.response.start":
+            self._start = message
+            if not _is_compressible(Headers(raw=message["headers"])):
+                self._mode = "passthrough"
+                await self._send(message)
+        elif message["type"] != "http.response.body":
+            await self._send(message)
+        elif self._mode == "compress":
+            await self._send_body(
+                message.get("body", b""), message.get("more_body", False)
+            )
+        else:
+            await self._collect(
+                message.get("body", b""), message.get("more_body", False)
+            )
+
+    async def _collect(self, chunk: bytes, more_body: bool) -> None:
+        """Buffer the start of the body until it is worth compressing or ends."""
+        assert self._start is not None
+        self._pending.append(chunk)
+        if sum(map(len, self._pending)) >= self._minimum_size:
+            self._mode = "compress"
+            headers = MutableHeaders(scope=self._start)
+            headers["Content-Encoding"] = self._encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers and not headers["etag"].startswith("W/"):
+                headers["ETag"] = f"W/{headers['etag']}"
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            body = self._compress(b"".join(self._pending), more_body)
+            if not more_body:
+                headers["Content-Length"] = str(len(body))
+            await self._send(self._start)
+            await self._send(
+                {"type": "http.response.body", "body": body, "more_body": more_body}
+            )
+        elif not more_body:
+            self._mode = "passthrough"
+            await self._send(self._start)
+            await self._send(
+                {"type": "http.response.body", "body": b"".join(self._pending)}
+            )
+
+    def _compress(self, chunk: bytes, more_body: bool) -> bytes:
+        body = self._compressor.compress(chunk)
+        return body + (
+            self._compressor.flush() if more_body else self._compressor.finish()
+        )
+
+    async def _send_body(self, chunk: bytes, more_body: bool) -> None:
+        await self._send(
+            {
+                "type": "http.response.body",
+                "body": self._compress(chunk, more_body),
+                "more_body": more_body,
+            }
+        )
@@ -8,10 +8,11 @@ Classes:
     Task: SQLAlchemy model for the 'task' table.
 """
 
+import datetime
 import enum
 from typing import Annotated
 
-from sqlalchemy import Column, Integer, String, Enum
+from sqlalchemy import Date, DateTime, Index, Integer, String, Enum, literal_column
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .database import Base
@@ -40,14 +41,34 @@ class Task(Base):  # pylint: disable=too-few-public-methods
         title (str): Title of the task.
         description (str): Description of the task.
         status (Status): Current status of the task.
-        due_date (str): Due date of the task.
+        due_date (date): Due date of the task.
+        version (int): Row version, incremented by every UPDATE of the row.
+        claimed_at (datetime): When a worker last claimed or renewed the task;
+            worker bookkeeping (column info "internal"), not part of the API.
     """
 
     __tablename__ = "task"
-    __table_args__ = {"schema": "public"}
+    __table_args__ = (
+        # Keyset pages filtered by status, e.g. all pending tasks by ID.
+        Index("ix_task_status_id", "status", "id"),
+        # Status plus due date range, e.g. overdue pending tasks.
+        Index("ix_task_status_due_date", "status", "due_date"),
+        Index("ix_task_due_date", "due_date"),
+        {"schema": "public"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String)
-    description = Column(String)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    title: Mapped[str | None] = mapped_column(String)
+    description: Mapped[str | None] = mapped_column(String)
     status: Mapped[StatusColumn]
-    due_date = Column(String)
+    due_date: Mapped[datetime.date | None] = mapped_column(Date)
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version") + 1,
+    )
+    claimed_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True), info={"internal": True}
+    )
@@ -5,19 +5,49 @@ This module defines the API endpoints for creating, retrieving, updating, and de
 It uses FastAPI for routing, Pydantic for data validation, and SQLAlchemy for database interactions.
 
 Endpoints:
-    - GET /task/ : Retrieve all tasks.
-    - GET /task/{task_id} : Retrieve a specific task by ID.
-    - POST /task/ : Create a new task.
-    - PUT /task/{task_id} : Update an existing task.
+    - GET /task/ : Retrieve a page of tasks (keyset pagination on `id`), optionally
+      filtered by status and due date.
+    - GET /task/{task_id} : Retrieve a specific task by ID (read-through cached).
+
+    Both GET endpoints send strong ETags and answer `If-None-Match` with
+    304 Not Modified when the client's copy is current. With
+    `fields=id,title,status` they select only those columns and return only
+    those fields; unknown field names are rejected with 422.
+    - POST /task/ : Create a new task (optionally group-committed with other creates).
+    - PUT /task/{task_id} : Update an existing task (None fields are left unchanged).
+    - PATCH /task/{task_id} : Partially update a task (only the fields sent are changed).
     - DELETE /task/{task_id} : Delete a task.
 
+    Single-task writes are one UPDATE/DELETE ... RETURNING statement each and
+    answer 404 when the task does not exist.
+    - POST /task/bulk : Create many tasks in one transaction.
+    - PATCH /task/bulk : Update many tasks in one transaction.
+    - DELETE /task/bulk : Delete many tasks in one transaction.
+    - GET /task/cache/stats : Hit/miss/eviction counters of the task cache.
+    - GET /task/export : Stream every task as NDJSON or CSV.
+
+    Every JSON endpoint declares a response model, so FastAPI validates the
+    returned ORM objects in one pass and serializes them with pydantic-core
+    instead of reflecting over each row with `jsonable_encoder`.
+
 Models:
     - TaskCreate: Schema for creating a task.
     - TaskResponse: Schema for returning task data.
+    - TaskRead: TaskResponse plus `id` and `version`, validated from ORM attributes.
+    - TaskPage: One page of the task list.
+    - TaskMessage: Plain confirmation message.
     - TaskUpdate: Schema for updating a task.
+    - TaskPatch: Schema for partially updating a task.
+    - TaskBulkUpdate: Schema for one item of a bulk update.
+    - TaskBulkResponse: Per-item results of a bulk operation.
+    - TaskListQuery: Pagination and filter parameters of the task list.
 
 Dependencies:
-    - Database session management via SQLAlchemy.
+    - Database session management via SQLAlchemy's asyncio extension, so database
+      round trips do not block the event loop. Sessions of GET requests read
+      from a replica when `DATABASE_REPLICA_URLS` is configured.
+    - Task cache backend (see `app.cache`), invalidated after every write.
+    - Optional insert coalescer (see `app.coalescer`) batching concurrent creates.
 
 Requires:
     - FastAPI
@@ -28,34 +58,205 @@ Requires:
 """
 
 import datetime
-from typing import Annotated
-
-from fastapi import APIRouter, Depends, Path
-from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from typing import Annotated, Any, Dict, Literal, Tuple
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic_core import to_json
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from ..database import SessionLocal
+from ..cache import CacheBackend, task_cache, task_cache_key
+from ..coalescer import InsertCoalescer, task_insert_coalescer
+from ..database import session_scope
+from ..etag import etag_matches, task_etag, task_page_etag
+from ..export import iter_csv, iter_ndjson
 from ..models import Task, Status as TaskStatus
 
 router = APIRouter(prefix="/task", tags=["task"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_BULK_SIZE = 1000
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+EXPORT_BATCH_SIZE = 1000
 
-def get_db():
+EXPORT_FORMATS = {
+    "ndjson": (iter_ndjson, "application/x-ndjson"),
+    "csv": (iter_csv, "text/csv"),
+}
+
+
+async def get_db(request: Request):
     """
-    Dependency that provides a database session.
+    Dependency that provides an asynchronous database session.
+
+    Sessions of GET / HEAD requests read from a replica when one is configured.
+
+    Args:
+        request (Request): The incoming request.
 
     Yields:
-        Session: SQLAlchemy database session.
+        AsyncSession: SQLAlchemy asyncio database session.
     """
-    db = SessionLocal()
-    try:
+    async with session_scope(read_only=request.method in READ_ONLY_METHODS) as db:
         yield db
-    finally:
-        db.close()
 
 
-db_dependency = Annotated[Session, Depends(get_db)]  # pylint: disable=invalid-name
+db_dependency = Annotated[AsyncSession, Depends(get_db)]  # pylint: disable=invalid-name
+
+
+def get_task_cache() -> CacheBackend:
+    """
+    Dependency that provides the task cache backend.
+
+    Returns:
+        CacheBackend: Process-wide task cache.
+    """
+    return task_cache
+
+
+cache_dependency = Annotated[  # pylint: disable=invalid-name
+    CacheBackend, Depends(get_task_cache)
+]
+
+
+def get_insert_coalescer() -> InsertCoalescer | None:
+    """
+    Dependency that provides the task insert coalescer.
+
+    Returns:
+        InsertCoalescer | None: The coalescer, or None when creates commit
+        one by one.
+    """
+    return task_insert_coalescer
+
+
+coalescer_dependency = Annotated[  # pylint: disable=invalid-name
+    InsertCoalescer | None, Depends(get_insert_coalescer)
+]
+
+
+def _task_to_dict(task: Task) -> Dict[str, Any]:
+    """Copy the column values of a task into a plain, cacheable dict."""
+    return {column.key: getattr(task, column.key) for column in Task.__table__.columns}
+
+
+# Fields a client can select with `fields=`, in column order.
+TASK_FIELDS = tuple(
+    column.key for column in Task.__table__.columns if not column.info.get("internal")
+)
+
+
+def get_fields(
+    fields: Annotated[
+        str | None,
+        Query(
+            description="Comma-separated task fields to return, e.g. id,title,status",
+            examples=["id,title,status"],
+        ),
+    ] = None,
+) -> Tuple[str, ...] | None:
+    """
+    Dependency that parses the `fields` projection of task reads.
+
+    Args:
+        fields (str | None): Comma-separated field names.
+
+    Returns:
+        tuple[str, ...] | None: Requested fields in request order, without
+        duplicates; None when every field is wanted.
+
+    Raises:
+        HTTPException: 422 if a name is not a task field or none is given.
+    """
+    if fields is None:
+        return None
+    requested = tuple(
+        dict.fromkeys(name.strip() for name in fields.split(",") if name.strip())
+    )
+    unknown = [name for name in requested if name not in TASK_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=(
+                f"Unknown fields: {', '.join(unknown) or '(none given)'}; "
+                f"allowed: {', '.join(TASK_FIELDS)}"
+            ),
+        )
+    return requested
+
+
+fields_dependency = Annotated[  # pylint: disable=invalid-name
+    Tuple[str, ...] | None, Depends(get_fields)
+]
+
+
+def _projected_columns(fields: Tuple[str, ...]) -> list:
+    """Columns to select for a projection; ID and version feed cursor and ETag."""
+    names = dict.fromkeys(("id", "version", *fields))
+    return [Task.__table__.c[name] for name in names]
+
+
+def _projected_response(content: Any, etag: str) -> Response:
+    """JSON response of a projection, serialized by pydantic-core."""
+    return Response(
+        content=to_json(content),
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
+
+
+def _task_not_found() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+
+async def _update_task_returning(
+    db: AsyncSession, task_id: int, changes: Dict[str, Any]
+) -> Task:
+    """
+    Apply `changes` to a task with one UPDATE ... RETURNING statement.
+
+    Args:
+        db (AsyncSession): Database session.
+        task_id (int): ID of the task to update.
+        changes (dict): Column values to write; may be empty.
+
+    Returns:
+        Task: The task as stored after the update.
+
+    Raises:
+        HTTPException: 404 if the task does not exist.
+    """
+    if not changes:
+        task_model = await db.get(Task, task_id)
+    else:
+        task_model = (
+            await db.scalars(
+                update(Task)
+                .where(Task.id == task_id)
+                .values(**changes)
+                .returning(Task)
+                .execution_options(synchronize_session=False)
+            )
+        ).one_or_none()
+        await db.commit()
+
+    if task_model is None:
+        raise _task_not_found()
+    return task_model
 
 
 class TaskCreate(BaseModel):
@@ -109,6 +310,51 @@ class TaskResponse(BaseModel):
     due_date: datetime.date | None
 
 
+class TaskRead(TaskResponse):
+    """
+    Schema for returning a stored task, read from ORM attributes.
+
+    Response validation of a whole list of tasks is one pydantic-core call, and
+    FastAPI serializes the validated result straight to JSON bytes.
+
+    Fields:
+        id (int): ID of the task.
+        title (str): Title of the task (not re-checked against the input rules).
+        version (int): Row version, bumped on every update.
+        Other fields as in TaskResponse.
+    """
+
+    id: int
+    title: str
+    version: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TaskPage(BaseModel):
+    """
+    Schema for one page of the task list.
+
+    Fields:
+        items (list[TaskRead]): Tasks of the page, ordered by ID.
+        next_cursor (int | None): `after` value of the next page; None on the last page.
+    """
+
+    items: list[TaskRead]
+    next_cursor: int | None
+
+
+class TaskMessage(BaseModel):
+    """
+    Schema for plain confirmation messages.
+
+    Fields:
+        message (str): Human readable outcome.
+    """
+
+    message: str
+
+
 class TaskUpdate(BaseModel):
     """
     Schema for updating an existing task.
@@ -139,96 +385,555 @@ class TaskUpdate(BaseModel):
     }
 
 
-@router.get("/", status_code=status.HTTP_200_OK)
-async def get_task(db: db_dependency):
+class TaskPatch(BaseModel):
+    """
+    Schema for partially updating an existing task.
+
+    Only the fields present in the request body are written; a field sent as
+    null clears it. Title and status cannot be cleared.
+
+    Fields:
+        title (str | None): New title for the task (minimum 10 characters).
+        description (str | None): New description (max 200 characters).
+        status (TaskStatus | None): New status.
+        due_date (datetime.date | None): New due date.
     """
-    Retrieve all tasks.
+
+    title: str | None = Field(default=None, min_length=10)
+    description: str | None = Field(default=None, max_length=200)
+    status: TaskStatus | None = None
+    due_date: datetime.date | None = None
+
+    model_config = {
+        "json_schema_extra": {"examples": [{"status": "completed"}]},
+    }
+
+    @model_validator(mode="after")
+    def check_required_fields_not_null(self):
+        """Reject explicit nulls for fields the task must always have."""
+        for field in ("title", "status"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+        return self
+
+
+class TaskBulkUpdate(TaskUpdate):
+    """
+    Schema for one item of a bulk update.
+
+    Fields:
+        id (int): ID of the task to update.
+        Other fields as in TaskUpdate; fields left as None are not changed.
+    """
+
+    id: int
+
+
+class TaskBulkItemResult(BaseModel):
+    """
+    Outcome of a single item of a bulk operation.
+
+    Fields:
+        index (int): Position of the item in the request array.
+        id (int | None): ID of the affected task.
+        result (str): One of "created", "updated", "deleted" or "not_found".
+    """
+
+    index: int
+    id: int | None
+    result: str
+
+
+class TaskBulkResponse(BaseModel):
+    """
+    Schema for the response of the bulk endpoints.
+
+    Fields:
+        results (list[TaskBulkItemResult]): One entry per request item, in order.
+    """
+
+    results: list[TaskBulkItemResult]
+
+
+class TaskListQuery(BaseModel):
+    """
+    Query parameters of the task list.
+
+    Fields:
+        limit (int): Page size, capped at MAX_PAGE_SIZE.
+        after (int | None): Cursor; ID of the last task of the previous page.
+        status (TaskStatus | None): Only return tasks with this status.
+        due_before (datetime.date | None): Only return tasks due before this date.
+        due_after (datetime.date | None): Only return tasks due after this date.
+    """
+
+    limit: int = Field(
+        DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Maximum number of tasks to return",
+    )
+    after: int | None = Field(
+        None, description="Cursor: return tasks with an ID greater than this one"
+    )
+    status: TaskStatus | None = None
+    due_before: datetime.date | None = Field(
+        None, description="Return tasks due strictly before this date"
+    )
+    due_after: datetime.date | None = Field(
+        None, description="Return tasks due strictly after this date"
+    )
+
+
+@router.get("/", status_code=status.HTTP_200_OK, response_model=TaskPage)
+async def get_task(
+    db: db_dependency,
+    response: Response,
+    params: Annotated[TaskListQuery, Query()],
+    fields: fields_dependency,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """
+    Retrieve a page of tasks ordered by ID.
+
+    Pagination is keyset-based: pass the `next_cursor` of a page as `after` to
+    fetch the next one. The query seeks on the primary key index, so the cost of
+    a page does not grow with the table size or with how deep the client is.
+    Status and due date filters are applied in SQL and served by the
+    status/due_date indexes of the task table.
+
+    The page ETag is derived from the IDs and row versions of its tasks.
+    With `fields`, only the requested columns are selected and every item
+    carries only the requested fields.
 
     Args:
-        db (Session): Database session dependency.
+        db (AsyncSession): Database session dependency.
+        response (Response): Outgoing response, used to set the ETag header.
+        params (TaskListQuery): Pagination and filter parameters.
+        fields (tuple[str, ...] | None): Fields to return; None for all.
+        if_none_match (str | None): ETags of the client's cached copies.
 
     Returns:
-        list: List of all Task objects.
+        TaskPage: `items` with the tasks of the page and `next_cursor`, which
+        is None on the last page; or an empty 304 response.
+    """
+    query = select(Task) if fields is None else select(*_projected_columns(fields))
+    if params.after is not None:
+        query = query.where(Task.id > params.after)
+    if params.status is not None:
+        query = query.where(Task.status == params.status)
+    if params.due_before is not None:
+        query = query.where(Task.due_date < params.due_before)
+    if params.due_after is not None:
+        query = query.where(Task.due_date > params.due_after)
+
+    # Fetch one extra row to know whether another page follows.
+    limit = params.limit
+    query = query.order_by(Task.id).limit(limit + 1)
+    result = await (db.scalars(query) if fields is None else db.execute(query))
+    tasks: Any = result.all()
+    next_cursor = tasks[limit - 1].id if len(tasks) > limit else None
+    tasks = tasks[:limit]
+
+    etag = task_page_etag(
+        ((task.id, task.version) for task in tasks), next_cursor, fields
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+    if fields is not None:
+        items = [{name: getattr(row, name) for name in fields} for row in tasks]
+        return _projected_response({"items": items, "next_cursor": next_cursor}, etag)
+
+    response.headers["ETag"] = etag
+    return {"items": tasks, "next_cursor": next_cursor}
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_tasks(
+    db: db_dependency,
+    export_format: Annotated[
+        Literal["ndjson", "csv"], Query(alias="format")
+    ] = "ndjson",
+):
     """
-    return db.query(Task).all()
+    Stream every task, ordered by ID, as NDJSON or CSV.
 
+    Rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE
+    and encoded batch by batch, so memory use does not depend on the table size
+    and the first bytes go out as soon as the first batch is read.
 
-@router.get("/{task_id}", status_code=status.HTTP_200_OK)
-async def get_user(task_id: int, db: db_dependency):
+    Args:
+        db (AsyncSession): Database session dependency.
+        export_format (str): "ndjson" (default) or "csv".
+
+    Returns:
+        StreamingResponse: The export, sent as an attachment.
     """
-    Retrieve a specific task by its ID.
+    result = await db.stream_scalars(
+        select(Task).order_by(Task.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    encoder, media_type = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        encoder(result.partitions()),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="tasks.{export_format}"'
+        },
+    )
+
+
+# Bulk operations are registered before the /{task_id} routes so that "bulk"
+# is not taken for a task ID.
+@router.post(
+    "/bulk", status_code=status.HTTP_201_CREATED, response_model=TaskBulkResponse
+)
+async def create_tasks_bulk(
+    user_request: Annotated[
+        list[TaskCreate], Body(min_length=1, max_length=MAX_BULK_SIZE)
+    ],
+    db: db_dependency,
+    cache: cache_dependency,
+):
+    """
+    Create many tasks with a single multi-row INSERT in one transaction.
 
     Args:
-        task_id (int): ID of the task to retrieve.
-        db (Session): Database session dependency.
+        user_request (list[TaskCreate]): Tasks to create.
+        db (AsyncSession): Database session dependency.
+        cache (CacheBackend): Task cache dependency.
 
     Returns:
-        Task | None: The Task object if found, else None.
+        TaskBulkResponse: The ID of every created task, in request order.
     """
-    return db.query(Task).filter(Task.id == task_id).first()
+    created_ids = (
+        await db.scalars(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True),
+            [item.model_dump() for item in user_request],
+        )
+    ).all()
+    await db.commit()
+    cache.delete(*(task_cache_key(task_id) for task_id in created_ids))
+
+    return {
+        "results": [
+            {"index": index, "id": task_id, "result": "created"}
+            for index, task_id in enumerate(created_ids)
+        ]
+    }
 
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_task(user_request: TaskCreate, db: db_dependency):
+@router.patch("/bulk", status_code=status.HTTP_200_OK, response_model=TaskBulkResponse)
+async def update_tasks_bulk(
+    user_request: Annotated[
+        list[TaskBulkUpdate], Body(min_length=1, max_length=MAX_BULK_SIZE)
+    ],
+    db: db_dependency,
+    cache: cache_dependency,
+):
+    """
+    Update many tasks in one transaction.
+
+    The existing IDs are looked up with one SELECT, then all changes are sent
+    as a single executemany UPDATE by primary key. Items whose task does not
+    exist are reported as "not_found" and do not fail the batch.
+
+    Args:
+        user_request (list[TaskBulkUpdate]): Changes to apply, one per task.
+        db (AsyncSession): Database session dependency.
+        cache (CacheBackend): Task cache dependency.
+
+    Returns:
+        TaskBulkResponse: Per-item result, in request order.
+    """
+    requested_ids = {item.id for item in user_request}
+    existing_ids = set(
+        (await db.scalars(select(Task.id).where(Task.id.in_(requested_ids)))).all()
+    )
+
+    changes = [
+        item.model_dump(exclude_none=True)
+        for item in user_request
+        if item.id in existing_ids
+    ]
+    # Items that only carry an ID have nothing to write.
+    changes = [change for change in changes if len(change) > 1]
+    if changes:
+        await db.execute(update(Task), changes)
+    await db.commit()
+    cache.delete(*(task_cache_key(task_id) for task_id in existing_ids))
+
+    return {
+        "results": [
+            {
+                "index": index,
+                "id": item.id,
+                "result": "updated" if item.id in existing_ids else "not_found",
+            }
+            for index, item in enumerate(user_request)
+        ]
+    }
+
+
+@router.delete("/bulk", status_code=status.HTTP_200_OK, response_model=TaskBulkResponse)
+async def delete_tasks_bulk(
+    task_ids: Annotated[list[int], Body(min_length=1, max_length=MAX_BULK_SIZE)],
+    db: db_dependency,
+    cache: cache_dependency,
+):
+    """
+    Delete many tasks with a single DELETE ... RETURNING statement.
+
+    Args:
+        task_ids (list[int]): IDs of the tasks to delete.
+        db (AsyncSession): Database session dependency.
+        cache (CacheBackend): Task cache dependency.
+
+    Returns:
+        TaskBulkResponse: Per-item result, in request order.
+    """
+    deleted_ids = set(
+        (
+            await db.scalars(
+                delete(Task)
+                .where(Task.id.in_(task_ids))
+                .returning(Task.id)
+                .execution_options(synchronize_session=False)
+            )
+        ).all()
+    )
+    await db.commit()
+    cache.delete(*(task_cache_key(task_id) for task_id in deleted_ids))
+
+    return {
+        "results": [
+            {
+                "index": index,
+                "id": task_id,
+                "result": "deleted" if task_id in deleted_ids else "not_found",
+            }
+            for index, task_id in enumerate(task_ids)
+        ]
+    }
+
+
+@router.get(
+    "/cache/stats", status_code=status.HTTP_200_OK, response_model=Dict[str, int]
+)
+async def get_cache_stats(cache: cache_dependency):
+    """
+    Report the counters of the task cache.
+
+    Args:
+        cache (CacheBackend): Task cache dependency.
+
+    Returns:
+        dict: Hits, misses, evictions, expirations and current size.
+    """
+    return cache.stats()
+
+
+@router.get(
+    "/{task_id}", status_code=status.HTTP_200_OK, response_model=TaskRead | None
+)
+async def get_user(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    task_id: int,
+    db: db_dependency,
+    cache: cache_dependency,
+    response: Response,
+    fields: fields_dependency,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """
+    Retrieve a specific task by its ID.
+
+    Lookups are served from the task cache when possible; on a miss the task
+    is loaded from the primary and cached, so a lagging replica cannot put a
+    row older than the last invalidation back into the cache. Missing tasks
+    are not cached.
+    A projection (`fields`) is cut from the cached task when there is one;
+    otherwise only its columns are selected, and the partial row is not cached.
+
+    Args:
+        task_id (int): ID of the task to retrieve.
+        db (AsyncSession): Database session dependency.
+        cache (CacheBackend): Task cache dependency.
+        response (Response): Outgoing response, used to set the ETag header.
+        fields (tuple[str, ...] | None): Fields to return; None for all.
+        if_none_match (str | None): ETags of the client's cached copies.
+
+    Returns:
+        TaskRead | None: The task (or the requested fields of it) if found,
+        else None; or an empty 304 response.
+    """
+    cache_key = task_cache_key(task_id)
+    task_data = cache.get(cache_key)
+    if task_data is None and fields is not None:
+        row = (
+            await db.execute(
+                select(*_projected_columns(fields)).where(Task.id == task_id)
+            )
+        ).one_or_none()
+        if row is None:
+            return None
+        task_data = row._asdict()
+    elif task_data is None:
+        task_model = (
+            await db.execute(
+                select(Task).where(Task.id == task_id),
+                bind_arguments={"primary": True},
+            )
+        ).scalar_one_or_none()
+        if task_model is None:
+            return None
+        task_data = _task_to_dict(task_model)
+        cache.set(cache_key, task_data)
+
+    etag = task_etag(task_data["id"], task_data["version"], fields)
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+    if fields is not None:
+        return _projected_response({name: task_data[name] for name in fields}, etag)
+
+    response.headers["ETag"] = etag
+    return task_data
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=TaskRead)
+async def create_task(
+    user_request: TaskCreate,
+    db: db_dependency,
+    cache: cache_dependency,
+    coalescer: coalescer_dependency,
+):
     """
     Create a new task.
 
+    With `TASK_INSERT_COALESCING` enabled, concurrent creates are grouped into
+    multi-row INSERTs that share one commit (see `app.coalescer`); otherwise
+    every create commits on its own.
+
     Args:
         user_request (TaskCreate): Task creation data.
-        db (Session): Database session dependency.
+        db (AsyncSession): Database session dependency.
+        cache (CacheBackend): Task cache dependency.
+        coalescer (InsertCoalescer | None): Task insert coalescer dependency.
 
     Returns:
-        Task: The created Task object.
+        TaskRead: The created task.
     """
-    task_request_model_dump = user_request.model_dump()
-    task_model = Task(**task_request_model_dump)
-    db.add(task_model)
-    db.commit()
-    db.refresh(task_model)
+    if coalescer is not None:
+        task_data = await coalescer.insert(user_request.model_dump())
+        cache.delete(task_cache_key(task_data["id"]))
+        return task_data
+
+    task_model = (
+        await db.scalars(
+            insert(Task).values(**user_request.model_dump()).returning(Task)
+        )
+    ).one()
+    await db.commit()
+    cache.delete(task_cache_key(task_model.id))
     return task_model
 
 
 # Update (PUT)
-@router.put("/{task_id}", status_code=status.HTTP_200_OK, response_model=TaskResponse)
-async def update_task(task_id: int, user_request: TaskUpdate, db: db_dependency):
+@router.put("/{task_id}", status_code=status.HTTP_200_OK, response_model=TaskRead)
+async def update_task(
+    task_id: int,
+    user_request: TaskUpdate,
+    db: db_dependency,
+    cache: cache_dependency,
+):
     """
     Update an existing task by its ID.
 
+    Fields sent as None are left unchanged.
+
     Args:
         task_id (int): ID of the task to update.
         user_request (TaskUpdate): Task update data.
-        db (Session): Database session dependency.
+        db (AsyncSession): Database session dependency.
+        cache (CacheBackend): Task cache dependency.
 
     Returns:
-        Task: The updated Task object.
+        TaskRead: The updated task.
+
+    Raises:
+        HTTPException: 404 if the task does not exist.
     """
-    task_model = db.query(Task).filter(Task.id == task_id).first()
+    task_model = await _update_task_returning(
+        db, task_id, user_request.model_dump(exclude_none=True)
+    )
+    cache.delete(task_cache_key(task_id))
+    return task_model
+
+
+# Partial update (PATCH)
+@router.patch("/{task_id}", status_code=status.HTTP_200_OK, response_model=TaskRead)
+async def patch_task(
+    task_id: int,
+    user_request: TaskPatch,
+    db: db_dependency,
+    cache: cache_dependency,
+):
+    """
+    Partially update an existing task by its ID.
 
-    for field in ["title", "description", "status", "due_date"]:
-        value = getattr(user_request, field)
-        if value is not None:
-            setattr(task_model, field, value)
+    Only the fields present in the request body are written.
 
-    db.commit()
+    Args:
+        task_id (int): ID of the task to update.
+        user_request (TaskPatch): Fields to change.
+        db (AsyncSession): Database session dependency.
+        cache (CacheBackend): Task cache dependency.
 
-    db.refresh(task_model)
+    Returns:
+        TaskRead: The updated task.
+
+    Raises:
+        HTTPException: 404 if the task does not exist.
+    """
+    task_model = await _update_task_returning(
+        db, task_id, user_request.model_dump(exclude_unset=True)
+    )
+    cache.delete(task_cache_key(task_id))
     return task_model
 
 
 # Delete (DELETE)
-@router.delete("/{task_id}")
-async def delete_item(task_id: int, db: db_dependency):
+@router.delete("/{task_id}", status_code=status.HTTP_200_OK, response_model=TaskMessage)
+async def delete_item(task_id: int, db: db_dependency, cache: cache_dependency):
     """
     Delete a task by its ID.
 
     Args:
         task_id (int): ID of the task to delete.
-        db (Session): Database session dependency.
+        db (AsyncSession): Database session dependency.
+        cache (CacheBackend): Task cache dependency.
 
     Returns:
         dict: Message indicating successful deletion.
+
+    Raises:
+        HTTPException: 404 if the task does not exist.
     """
-    db_task = db.query(Task).filter(Task.id == task_id).first()
-    db.delete(db_task)
-    db.commit()
+    deleted_id = (
+        await db.scalars(
+            delete(Task)
+            .where(Task.id == task_id)
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+    ).one_or_none()
+    await db.commit()
+
+    if deleted_id is None:
+        raise _task_not_found()
+    cache.delete(task_cache_key(task_id))
     return {"message": "Item deleted successfully"}
@@ -0,0 +1,80 @@
+"""
+Unit tests for the in-process task cache backend.
+"""
+
+from ..cache import LRUTTLCache, task_cache_key
+
+
+class FakeClock:  # pylint: disable=too-few-public-methods
+    """
+    Manually advanced time source for TTL tests.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_hit_and_miss_counters():
+    """
+    Test that lookups are counted as hits and misses.
+    """
+    cache = LRUTTLCache(max_entries=10, ttl_seconds=60)
+    assert cache.get("missing") is None
+    cache.set("key", {"id": 1})
+    assert cache.get("key") == {"id": 1}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """
+    Test that the least recently used entry is evicted beyond capacity.
+    """
+    cache = LRUTTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_entries_expire():
+    """
+    Test that entries are dropped once their TTL has passed.
+    """
+    clock = FakeClock()
+    cache = LRUTTLCache(max_entries=10, ttl_seconds=5, clock=clock)
+    cache.set("key", "value")
+
+    clock.now = 4.9
+    assert cache.get("key") == "value"
+    clock.now = 5.0
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_delete_and_disabled_cache():
+    """
+    Test explicit invalidation and that a zero-capacity cache stores nothing.
+    """
+    cache = LRUTTLCache(max_entries=10, ttl_seconds=60)
+    cache.set(task_cache_key(1), "one")
+    cache.set(task_cache_key(2), "two")
+    cache.delete(task_cache_key(1), task_cache_key(3))
+    assert cache.get(task_cache_key(1)) is None
+    assert cache.get(task_cache_key(2)) == "two"
+
+    disabled = LRUTTLCache(max_entries=0)
+    disabled.set("key", "value")
+    assert disabled.get("key") is None
@@ -0,0 +1,163 @@
+"""
+Tests for the shared engine registry and the read-replica routing.
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import column, create_engine, insert, table, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.db.base_db import get_async_engine, get_engine, pool_options
+
+from .. import database, main
+from ..database import (
+    ReplicaPool,
+    RoutingSession,
+    async_engine,
+    db_url,
+    engine,
+    to_async_url,
+)
+
+
+def test_engines_are_shared_per_url():
+    """
+    Test that asking the registry for a known URL returns the existing engine.
+    """
+    assert get_engine(db_url) is engine
+    assert get_async_engine(to_async_url(db_url)) is async_engine
+
+
+def test_pool_options_from_environment(monkeypatch):
+    """
+    Test that pool parameters are read from the environment.
+    """
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+
+    options = pool_options("postgresql://user:secret@db/tasks")
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 0
+    assert options["pool_pre_ping"] is False
+
+    assert "pool_size" not in pool_options("sqlite://")
+
+
+def test_lifespan_disposes_pools(monkeypatch):
+    """
+    Test that application shutdown disposes the sync and asyncio pools.
+    """
+    disposed = []
+
+    async def dispose_async():
+        disposed.append("async")
+
+    monkeypatch.setattr(main, "dispose_async_engines", dispose_async)
+    monkeypatch.setattr(main, "dispose_engines", lambda: disposed.append("sync"))
+
+    with TestClient(main.app) as lifespan_client:
+        assert lifespan_client.get("/healthy").status_code == 200
+        assert not disposed
+    assert disposed == ["async", "sync"]
+
+
+class FakeReplicaPool(ReplicaPool):
+    """
+    Replica pool whose replication lag is set by the test.
+    """
+
+    def __init__(self, lags, delay=0.0, **kwargs):
+        super().__init__(list(lags), **kwargs)
+        self.lags = lags
+        self.delay = delay
+        self.checks = 0
+
+    async def lag(self, replica):
+        self.checks += 1
+        await asyncio.sleep(self.delay)
+        lag = self.lags[replica]
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+
+def test_replica_pool_skips_lagging_replicas():
+    """
+    Test round-robin selection, lag fallback and the lag check interval.
+    """
+    clock = [0.0]
+    pool = FakeReplicaPool(
+        {"a": 0.0, "b": 30.0, "c": 1.0}, max_lag=5, clock=lambda: clock[0]
+    )
+
+    picked = [asyncio.run(pool.pick()) for _ in range(4)]
+    assert picked == ["a", "c", "a", "c"]
+    assert pool.checks == 3
+
+    pool.lags.update(a=RuntimeError("down"), c=60.0)
+    assert asyncio.run(pool.pick()) == "a"
+    clock[0] = 10.0
+    assert asyncio.run(pool.pick()) is None
+    assert asyncio.run(FakeReplicaPool({}).pick()) is None
+
+
+def test_replica_pool_shares_and_bounds_lag_checks():
+    """
+    Test that concurrent picks share one lag check and a hung check times out.
+    """
+    pool = FakeReplicaPool({"a": 0.0}, delay=0.01)
+
+    async def concurrent_picks():
+        return await asyncio.gather(*(pool.pick() for _ in range(5)))
+
+    assert asyncio.run(concurrent_picks()) == ["a"] * 5
+    assert pool.checks == 1
+
+    hung = FakeReplicaPool({"a": 0.0}, delay=60.0, check_timeout=0.01)
+    assert asyncio.run(asyncio.wait_for(hung.pick(), 5)) is None
+
+
+def test_routing_session_reads_from_replica_and_writes_to_primary():
+    """
+    Test that reads use the replica and flushes go to the primary.
+    """
+    primary, replica = create_engine("sqlite://"), create_engine("sqlite://")
+    for target, label in ((primary, "primary"), (replica, "replica")):
+        with target.begin() as conn:
+            conn.execute(text("CREATE TABLE source (label TEXT)"))
+            conn.execute(text("INSERT INTO source VALUES (:label)"), {"label": label})
+
+    with RoutingSession(bind=primary, info={"replica": replica}) as session:
+        assert session.execute(text("SELECT label FROM source")).scalar() == "replica"
+        primary_read = session.execute(
+            text("SELECT label FROM source"), bind_arguments={"primary": True}
+        )
+        assert primary_read.scalar() == "primary"
+        session.execute(insert(table("source", column("label"))).values(label="new"))
+        session.commit()
+
+    with RoutingSession(bind=primary) as session:
+        labels = session.execute(text("SELECT label FROM source")).scalars().all()
+    assert labels == ["primary", "new"]
+
+
+def test_session_scope_falls_back_to_primary(monkeypatch):
+    """
+    Test that read-only sessions only get a replica when the pool offers one.
+    """
+    replica = create_async_engine("sqlite+aiosqlite://")
+    monkeypatch.setattr(database, "replica_pool", FakeReplicaPool({replica: 0.0}))
+
+    async def replica_binds():
+        binds = []
+        for read_only in (True, False):
+            async with database.session_scope(read_only=read_only) as session:
+                binds.append(session.sync_session.info.get("replica"))
+        return binds
+
+    assert asyncio.run(replica_binds()) == [replica.sync_engine, None]
+
+    monkeypatch.setattr(database, "replica_pool", FakeReplicaPool({}))
+    assert asyncio.run(replica_binds()) == [None, None]
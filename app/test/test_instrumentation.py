@@ -0,0 +1,96 @@
+"""
+Tests for the slow-query log and the per-request query counting.
+"""
+
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from core.db import instrumentation
+
+from .utils import app, client, engine, override_get_db
+from ..routers.task import get_db
+
+LOGGER_NAME = "core.db.instrumentation"
+
+
+@pytest.fixture(name="sync_engine")
+def fixture_sync_engine():
+    """
+    Fresh, instrumented in-memory SQLite engine.
+    """
+    sqlite_engine = create_engine("sqlite://")
+    instrumentation.instrument_engine(sqlite_engine)
+    yield sqlite_engine
+    sqlite_engine.dispose()
+
+
+def test_repeated_statement_shape_is_reported(sync_engine, caplog, monkeypatch):
+    """
+    Test that a statement repeated in a loop inside one scope is flagged.
+    """
+    monkeypatch.setattr(instrumentation, "REPEATED_QUERY_THRESHOLD", 5)
+    caplog.set_level(logging.WARNING, logger=LOGGER_NAME)
+
+    with instrumentation.query_scope("job") as stats, sync_engine.connect() as conn:
+        for value in range(6):
+            conn.execute(text("SELECT :value"), {"value": value})
+        conn.execute(text("SELECT 1"))
+
+    assert stats.count == 7
+    warnings = [r.getMessage() for r in caplog.records if "N+1" in r.getMessage()]
+    assert len(warnings) == 1
+    assert "job" in warnings[0] and "6 times" in warnings[0]
+
+
+def test_slow_query_parameters_are_redacted(sync_engine, caplog, monkeypatch):
+    """
+    Test that slow statements are logged without their parameter values.
+    """
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 0)
+    caplog.set_level(logging.WARNING, logger=LOGGER_NAME)
+
+    with sync_engine.connect() as conn:
+        conn.execute(text("SELECT :secret"), {"secret": "hunter2"})
+
+    messages = [
+        r.getMessage() for r in caplog.records if "Slow query" in r.getMessage()
+    ]
+    assert messages
+    assert "hunter2" not in messages[0]
+    assert "<str>" in messages[0]
+
+
+def test_failed_statement_is_not_timed(sync_engine, caplog, monkeypatch):
+    """
+    Test that a failing statement leaves no start time behind for the next one.
+    """
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 0)
+    caplog.set_level(logging.WARNING, logger=LOGGER_NAME)
+
+    with instrumentation.query_scope("job") as stats, sync_engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert "query_start_time" not in conn.info
+
+    assert stats.count == 1
+    assert [r for r in caplog.records if "Slow query" in r.getMessage()]
+
+
+def test_request_gets_its_own_query_scope(caplog, monkeypatch):
+    """
+    Test that the middleware counts the queries of each request on the async engine.
+    """
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    instrumentation.instrument_engine(engine.sync_engine)
+    monkeypatch.setattr(instrumentation, "ENABLED", True)
+    caplog.set_level(logging.DEBUG, logger=LOGGER_NAME)
+
+    assert client.get("/task/?limit=1").status_code == 200
+
+    summaries = [r.getMessage() for r in caplog.records if "issued" in r.getMessage()]
+    assert summaries == [summaries[0]]
+    assert summaries[0].startswith("GET /task/ issued 1 queries")
@@ -0,0 +1,97 @@
+"""
+Unit tests for the metrics registry and the /metrics endpoint.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app import main
+
+from ..metrics import MetricsRegistry, register_pool_metrics
+
+client = TestClient(main.app)
+
+
+def test_registry_renders_prometheus_text():
+    """
+    Test the exposition format of counters, gauges and histograms.
+    """
+    metrics_registry = MetricsRegistry()
+    requests = metrics_registry.counter("jobs_total", "Jobs run.", ("kind",))
+    in_flight = metrics_registry.gauge("jobs_in_progress", "Jobs running.")
+    duration = metrics_registry.histogram(
+        "job_seconds", "Job duration.", buckets=(0.1, 1.0)
+    )
+
+    requests.inc(kind="import")
+    requests.inc(2, kind="import")
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    duration.observe(0.05)
+    duration.observe(0.5)
+    duration.observe(3)
+
+    lines = metrics_registry.render().splitlines()
+    assert "# TYPE jobs_total counter" in lines
+    assert 'jobs_total{kind="import"} 3' in lines
+    assert "jobs_in_progress 1" in lines
+    assert 'job_seconds_bucket{le="0.1"} 1' in lines
+    assert 'job_seconds_bucket{le="1"} 2' in lines
+    assert 'job_seconds_bucket{le="+Inf"} 3' in lines
+    assert "job_seconds_sum 3.55" in lines
+    assert "job_seconds_count 3" in lines
+
+
+def test_registry_rejects_wrong_labels():
+    """
+    Test that samples must carry exactly the declared labels.
+    """
+    metrics_registry = MetricsRegistry()
+    requests = metrics_registry.counter("jobs_total", "Jobs run.", ("kind",))
+    with pytest.raises(ValueError):
+        requests.inc(kind="import", extra="x")
+
+
+def test_pool_overflow_is_never_negative(tmp_path):
+    """
+    Test that a pool below its size reports no overflow connections.
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db", poolclass=QueuePool, pool_size=5
+    )
+    metrics_registry = MetricsRegistry()
+    register_pool_metrics(metrics_registry, {"primary": engine})
+    with engine.connect():
+        assert engine.pool.overflow() < 0
+        lines = metrics_registry.render().splitlines()
+    engine.dispose()
+
+    assert 'db_pool_overflow{engine="primary"} 0' in lines
+    assert 'db_pool_checked_out{engine="primary"} 1' in lines
+
+
+def test_metrics_endpoint():
+    """
+    Test that /metrics reports per-route request counts, latency histograms,
+    pool and cache metrics.
+    """
+    client.get("/healthy")
+    client.get("/does-not-exist")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/healthy",status="200"}' in body
+    assert 'route="unmatched",status="404"' in body
+    assert (
+        'http_request_duration_seconds_bucket{method="GET",route="/healthy",le="+Inf"}'
+        in body
+    )
+    assert 'http_requests_in_progress{method="GET"} 1' in body
+    assert "# TYPE db_pool_checkouts_total counter" in body
+    assert 'cache_hits_total{cache="task"}' in body
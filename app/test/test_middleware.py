@@ -0,0 +1,257 @@
+"""
+Unit tests for the request timing and logging middleware.
+"""
+
+import asyncio
+import gzip
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from ..metrics import http_requests_shed_total
+from ..middleware import (
+    CompressionMiddleware,
+    ConcurrencyLimit,
+    ConcurrencyLimitMiddleware,
+    RequestTimingMiddleware,
+    logger,
+    negotiate_encoding,
+)
+
+streaming_app = FastAPI()
+streaming_app.add_middleware(RequestTimingMiddleware)
+
+
+@streaming_app.get("/stream")
+def stream():
+    """
+    Endpoint streaming its body in several chunks.
+    """
+    return StreamingResponse(
+        (f"chunk-{i}\n" for i in range(3)), media_type="text/plain"
+    )
+
+
+@streaming_app.get("/boom")
+def boom():
+    """
+    Endpoint that always fails.
+    """
+    raise RuntimeError("boom")
+
+
+streaming_client = TestClient(streaming_app, raise_server_exceptions=False)
+
+
+def test_process_time_header():
+    """
+    Test that responses carry a numeric X-Process-Time header.
+    """
+    response = streaming_client.get("/stream")
+    assert float(response.headers["X-Process-Time"]) >= 0
+
+
+def test_streaming_body_passes_through():
+    """
+    Test that a streaming body arrives complete and unbuffered by the middleware.
+    """
+    with streaming_client.stream("GET", "/stream") as response:
+        chunks = list(response.iter_text())
+    assert "".join(chunks) == "chunk-0\nchunk-1\nchunk-2\n"
+    assert "X-Process-Time" in response.headers
+
+
+def test_request_logging(caplog: pytest.LogCaptureFixture):
+    """
+    Test that requests, their completion and their errors are logged.
+    """
+    logger.addHandler(caplog.handler)
+    try:
+        with caplog.at_level(logging.INFO, logger=logger.name):
+            streaming_client.get("/stream", params={"q": "1"})
+            streaming_client.get("/boom")
+    finally:
+        logger.removeHandler(caplog.handler)
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("Path: /stream, Query: {'q': '1'}" in m for m in messages)
+    assert any("Path: /stream, Status: 200" in m for m in messages)
+    assert "Request error: boom" in messages
+
+
+def _limited_app(limit: ConcurrencyLimit):
+    """
+    App whose /slow endpoint blocks until the returned gate is opened.
+    """
+    limited_app = FastAPI()
+    gate = asyncio.Event()
+
+    @limited_app.get("/slow")
+    async def slow():
+        await gate.wait()
+        return {"ok": True}
+
+    @limited_app.get("/healthy")
+    async def healthy():
+        return {"status": "Healthy"}
+
+    limited_app.add_middleware(
+        ConcurrencyLimitMiddleware, limits={"read": limit}, retry_after=7
+    )
+    return limited_app, gate
+
+
+def _shed_count(reason: str) -> float:
+    _, _, _, samples = http_requests_shed_total.collect()
+    return sum(
+        value
+        for _, labels, value in samples
+        if labels == {"route_class": "read", "reason": reason}
+    )
+
+
+def test_concurrency_limit_queues_then_sheds():
+    """
+    Test that requests beyond the limit queue, and overflow the queue with 503.
+    """
+
+    async def scenario():
+        limited_app, gate = _limited_app(ConcurrencyLimit(1, 1, queue_timeout=5))
+        transport = httpx.ASGITransport(app=limited_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as cli:
+            running = asyncio.create_task(cli.get("/slow"))
+            await asyncio.sleep(0.01)
+            queued = asyncio.create_task(cli.get("/slow"))
+            await asyncio.sleep(0.01)
+
+            shed = await cli.get("/slow")
+            assert (await cli.get("/healthy")).status_code == 200
+            gate.set()
+            return shed, await running, await queued
+
+    shed_before = _shed_count("queue_full")
+    shed, running, queued = asyncio.run(scenario())
+
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "7"
+    assert running.status_code == 200 and queued.status_code == 200
+    assert _shed_count("queue_full") == shed_before + 1
+
+
+def test_concurrency_limit_queue_timeout():
+    """
+    Test that a queued request is shed once its wait exceeds the queue timeout.
+    """
+
+    async def scenario():
+        limited_app, gate = _limited_app(ConcurrencyLimit(1, 5, queue_timeout=0.05))
+        transport = httpx.ASGITransport(app=limited_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as cli:
+            running = asyncio.create_task(cli.get("/slow"))
+            await asyncio.sleep(0.01)
+            timed_out = await cli.get("/slow")
+            gate.set()
+            await running
+            # The slot is free again once the first request finished.
+            return timed_out, await cli.get("/slow")
+
+    shed_before = _shed_count("queue_timeout")
+    timed_out, after = asyncio.run(scenario())
+
+    assert timed_out.status_code == 503
+    assert after.status_code == 200
+    assert _shed_count("queue_timeout") == shed_before + 1
+
+
+compressed_app = FastAPI()
+compressed_app.add_middleware(CompressionMiddleware, minimum_size=100)
+LARGE_BODY = "task " * 200
+
+
+@compressed_app.get("/large")
+def large():
+    """
+    Endpoint with a body above the compression threshold.
+    """
+    return PlainTextResponse(LARGE_BODY, headers={"ETag": '"v1"'})
+
+
+@compressed_app.get("/small")
+def small():
+    """
+    Endpoint with a body below the compression threshold.
+    """
+    return PlainTextResponse("tiny")
+
+
+compressed_client = TestClient(compressed_app)
+
+
+def test_negotiate_encoding():
+    """
+    Test Accept-Encoding negotiation with q-values and server preference.
+    """
+    assert negotiate_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert negotiate_encoding("br;q=0.5, gzip", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("*", ["br", "gzip"]) == "br"
+    assert negotiate_encoding("gzip;q=0, identity", ["br", "gzip"]) is None
+    assert negotiate_encoding("", ["gzip"]) is None
+
+
+def test_compression_above_threshold():
+    """
+    Test that large bodies are compressed and small ones are sent as is.
+    """
+    response = compressed_client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["ETag"] == 'W/"v1"'
+    assert int(response.headers["Content-Length"]) < len(LARGE_BODY)
+    assert response.text == LARGE_BODY
+
+    response = compressed_client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.text == "tiny"
+
+    response = compressed_client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["ETag"] == '"v1"'
+
+
+def test_compression_keeps_streaming():
+    """
+    Test that streamed bodies are compressed and flushed chunk by chunk.
+    """
+    lines = [f"line {i}\n" * 20 for i in range(5)]
+    messages = []
+    ndjson = [(b"content-type", b"application/x-ndjson")]
+
+    async def chunked_app(_scope, _receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": ndjson})
+        for line in lines:
+            await send(
+                {"type": "http.response.body", "body": line.encode(), "more_body": True}
+            )
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    middleware = CompressionMiddleware(chunked_app, minimum_size=100)
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(middleware(scope, receive, send))
+
+    headers = dict(messages[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    chunks = [m["body"] for m in messages[1:] if m.get("more_body")]
+    assert len(chunks) == 5 and all(chunks)
+    body = b"".join(m["body"] for m in messages[1:])
+    assert gzip.decompress(body).decode() == "".join(lines)
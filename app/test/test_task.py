@@ -2,8 +2,21 @@
 Unit tests for the task-related API endpoints in the FastAPI application.
 """
 
-from .utils import app, client, override_get_db
-from ..routers.task import get_db
+import asyncio
+import csv
+import io
+import json
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from .utils import TestingSessionLocal, app, client, engine, override_get_db
+from ..cache import task_cache, task_cache_key
+from ..coalescer import InsertCoalescer
+from ..database import Base, RoutingSession, engine_options
+from ..models import Status, Task
+from ..routers.task import get_db, get_insert_coalescer
 
 app.dependency_overrides[get_db] = override_get_db
 
@@ -26,13 +39,55 @@ def test_post_task():
 
 def test_get_task():
     """
-    Test retrieving all tasks from the /task endpoint.
-    Asserts that the response is a non-empty list and status code is 200.
+    Test retrieving a page of tasks from the /task endpoint.
+    Asserts that the response holds a non-empty list of items and status code is 200.
     """
     response = client.get("/task")
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
-    assert len(response.json()) > 0
+    assert isinstance(response.json()["items"], list)
+    assert len(response.json()["items"]) > 0
+
+
+def test_get_task_pagination():
+    """
+    Test walking the task list page by page with the `after` cursor.
+    Asserts that pages do not overlap and the last page has no next cursor.
+    """
+    headers = {"Content-Type": "application/json", "Accept": "text/plain"}
+    payload = {
+        "description": "With pure water",
+        "due_date": "2027-07-21",
+        "status": "pending",
+        "title": "[TEST_TEST_TEST]",
+    }
+    for _ in range(3):
+        client.post("/task/", headers=headers, json=payload)
+
+    seen_ids: list[int] = []
+    cursor = None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "after": cursor}
+        response = client.get("/task/", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen_ids.extend(task["id"] for task in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        assert cursor == page["items"][-1]["id"]
+
+    assert seen_ids == sorted(set(seen_ids))
+    assert len(seen_ids) >= 4
+
+
+def test_get_task_limit_cap():
+    """
+    Test that page sizes above the server-side cap are rejected.
+    Asserts that the response status code is 422 (Unprocessable Entity).
+    """
+    response = client.get("/task/", params={"limit": 10_000})
+    assert response.status_code == 422
 
 
 def test_get_task_by_id():
@@ -41,7 +96,7 @@ def test_get_task_by_id():
     Asserts that the returned task matches the requested ID and status code is 200.
     """
     tasks_list_response = client.get("/task")
-    tasks_list_json = tasks_list_response.json()
+    tasks_list_json = tasks_list_response.json()["items"]
 
     task_id = tasks_list_json[0]["id"]
     response = client.get(f"/task/{task_id}")
@@ -63,9 +118,407 @@ def test_delete_test_task():
     Test deleting a task with the title '[TEST_TEST_TEST]' via the /task/{id} endpoint.
     Asserts that the response status code is 200 upon successful deletion.
     """
-    tasks_list_response = client.get("/task")
-    tasks_list_json = tasks_list_response.json()
+    tasks_list_response = client.get("/task", params={"limit": 500})
+    tasks_list_json = tasks_list_response.json()["items"]
     for task in tasks_list_json:
         if task["title"] == "[TEST_TEST_TEST]":
             response = client.delete(f"/task/{task['id']}")
             assert response.status_code == 200
+
+
+def test_bulk_task_lifecycle():
+    """
+    Test creating, updating and deleting tasks through the /task/bulk endpoints.
+    Asserts per-item results for existing and missing tasks.
+    """
+    payload = [
+        {
+            "description": f"Bulk task {i}",
+            "due_date": "2027-07-21",
+            "status": "pending",
+            "title": "[TEST_BULK_TEST]",
+        }
+        for i in range(3)
+    ]
+    response = client.post("/task/bulk", json=payload)
+    assert response.status_code == 201
+    results = response.json()["results"]
+    assert [item["index"] for item in results] == [0, 1, 2]
+    assert all(item["result"] == "created" for item in results)
+    task_ids = [item["id"] for item in results]
+    assert len(set(task_ids)) == 3
+
+    missing_id = max(task_ids) + 1000
+    updates = [
+        {"id": task_ids[0], "status": "completed"},
+        {"id": missing_id, "status": "failed"},
+        {"id": task_ids[1], "status": None, "description": "Changed"},
+    ]
+    response = client.patch("/task/bulk", json=updates)
+    assert response.status_code == 200
+    assert [item["result"] for item in response.json()["results"]] == [
+        "updated",
+        "not_found",
+        "updated",
+    ]
+    first = client.get(f"/task/{task_ids[0]}").json()
+    assert first["status"] == "completed"
+    assert first["version"] == 2
+    second = client.get(f"/task/{task_ids[1]}").json()
+    assert second["description"] == "Changed"
+    assert second["status"] == "pending"
+
+    response = client.request("DELETE", "/task/bulk", json=[*task_ids, missing_id])
+    assert response.status_code == 200
+    assert [item["result"] for item in response.json()["results"]] == [
+        "deleted",
+        "deleted",
+        "deleted",
+        "not_found",
+    ]
+
+
+def test_bulk_task_size_limits():
+    """
+    Test that empty batches are rejected by the bulk endpoints.
+    Asserts that the response status code is 422 (Unprocessable Entity).
+    """
+    assert client.post("/task/bulk", json=[]).status_code == 422
+    assert client.request("DELETE", "/task/bulk", json=[]).status_code == 422
+
+
+def test_get_task_by_id_is_cached_and_invalidated():
+    """
+    Test that repeated lookups are served from the cache and that an update
+    invalidates the cached task.
+    """
+    payload = {
+        "description": "Cached task",
+        "due_date": "2027-07-21",
+        "status": "pending",
+        "title": "[TEST_TEST_TEST]",
+    }
+    task_id = client.post("/task/", json=payload).json()["id"]
+
+    client.get(f"/task/{task_id}")
+    hits_before = client.get("/task/cache/stats").json()["hits"]
+    assert client.get(f"/task/{task_id}").json()["status"] == "pending"
+    assert client.get("/task/cache/stats").json()["hits"] == hits_before + 1
+
+    response = client.put(f"/task/{task_id}", json={"status": "completed"})
+    assert response.status_code == 200
+    assert client.get(f"/task/{task_id}").json()["status"] == "completed"
+
+
+def test_get_task_by_id_caches_primary_rows_only(monkeypatch):
+    """
+    Test that a cache miss on a replica session loads the task from the
+    primary, so a lagging replica cannot cache a stale row.
+    """
+    payload = {
+        "description": "Fresh on the primary",
+        "due_date": "2027-07-21",
+        "status": "completed",
+        "title": "[TEST_TEST_TEST]",
+    }
+    task_id = client.post("/task/", json=payload).json()["id"]
+
+    replica = create_async_engine(
+        "sqlite+aiosqlite://", poolclass=StaticPool, **engine_options("sqlite://")
+    )
+
+    async def create_stale_replica():
+        async with replica.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.execute(
+                insert(Task).values(
+                    id=task_id, title="[TEST_TEST_TEST]", status=Status.PENDING
+                )
+            )
+
+    asyncio.run(create_stale_replica())
+    replica_sessions = async_sessionmaker(
+        engine, sync_session_class=RoutingSession, expire_on_commit=False
+    )
+
+    async def replica_db():
+        async with replica_sessions(info={"replica": replica.sync_engine}) as db:
+            yield db
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, replica_db)
+    assert client.get(f"/task/{task_id}").json()["status"] == "completed"
+    assert task_cache.get(task_cache_key(task_id))["status"] == Status.COMPLETED
+
+
+def test_get_task_by_id_conditional_get():
+    """
+    Test that a single task carries an ETag, that a matching If-None-Match
+    yields 304, and that an update changes the ETag.
+    """
+    payload = {
+        "description": "Conditional task",
+        "due_date": "2027-07-21",
+        "status": "pending",
+        "title": "[TEST_TEST_TEST]",
+    }
+    task_id = client.post("/task/", json=payload).json()["id"]
+
+    response = client.get(f"/task/{task_id}")
+    etag = response.headers["ETag"]
+    assert response.json()["version"] == 1
+
+    response = client.get(f"/task/{task_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    client.put(f"/task/{task_id}", json={"status": "failed"})
+    response = client.get(f"/task/{task_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["version"] == 2
+
+
+def test_get_task_conditional_get():
+    """
+    Test that a task list page carries an ETag that changes when a task on
+    the page is updated.
+    """
+    params = {"limit": 5}
+    response = client.get("/task/", params=params)
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        "/task/", params=params, headers={"If-None-Match": f'W/{etag}, "other"'}
+    )
+    assert response.status_code == 304
+
+    first = client.get("/task/", params=params).json()["items"][0]
+    changes = {"status": None, "description": f"{first['description']} (edited)"}
+    client.put(f"/task/{first['id']}", json=changes)
+    response = client.get("/task/", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_get_task_filters():
+    """
+    Test filtering the task list by status and due date range.
+    Asserts that only matching tasks are returned.
+    """
+    payload = [
+        {"title": "[TEST_FILTER_TEST]", "status": status, "due_date": due_date}
+        for status, due_date in [
+            ("pending", "2020-01-10"),
+            ("pending", "2020-02-10"),
+            ("completed", "2020-01-15"),
+            ("pending", "2099-01-01"),
+        ]
+    ]
+    created = client.post("/task/bulk", json=payload).json()["results"]
+    created_ids = {item["id"] for item in created}
+
+    def matching_ids(params):
+        params = {"limit": 500, **params}
+        items = client.get("/task/", params=params).json()["items"]
+        return [task["id"] for task in items if task["id"] in created_ids]
+
+    ids = [item["id"] for item in created]
+    overdue_pending = {"status": "pending", "due_before": "2021-01-01"}
+    assert matching_ids(overdue_pending) == ids[:2]
+    assert matching_ids({"due_after": "2020-01-12", "due_before": "2021-01-01"}) == [
+        ids[1],
+        ids[2],
+    ]
+    assert matching_ids({"status": "completed"}) == [ids[2]]
+    assert client.get("/task/", params={"status": "unknown"}).status_code == 422
+
+    client.request("DELETE", "/task/bulk", json=ids)
+
+
+def test_export_tasks():
+    """
+    Test exporting all tasks as NDJSON and as CSV.
+    Asserts that both formats contain every task of the list endpoint.
+    """
+    task_ids = [
+        task["id"]
+        for task in client.get("/task/", params={"limit": 500}).json()["items"]
+    ]
+
+    response = client.get("/task/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == task_ids
+    assert {"title", "status", "due_date", "version"} <= rows[0].keys()
+
+    response = client.get("/task/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    csv_rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["id"]) for row in csv_rows] == task_ids
+    assert csv_rows[0]["status"] == rows[0]["status"]
+
+    assert client.get("/task/export", params={"format": "xml"}).status_code == 422
+
+
+def test_patch_task_partial_update():
+    """
+    Test that PATCH only writes the fields sent and rejects clearing the status.
+    """
+    payload = {
+        "description": "Patched task",
+        "due_date": "2027-07-21",
+        "status": "pending",
+        "title": "[TEST_TEST_TEST]",
+    }
+    task_id = client.post("/task/", json=payload).json()["id"]
+
+    response = client.patch(f"/task/{task_id}", json={"status": "progress"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "progress"
+    assert response.json()["description"] == "Patched task"
+
+    response = client.patch(f"/task/{task_id}", json={"description": None})
+    assert response.status_code == 200
+    assert response.json()["description"] is None
+    assert response.json()["status"] == "progress"
+    assert client.get(f"/task/{task_id}").json()["version"] == 3
+
+    assert client.patch(f"/task/{task_id}", json={"status": None}).status_code == 422
+    assert client.patch(f"/task/{task_id}", json={}).status_code == 200
+
+
+def test_write_missing_task_returns_404():
+    """
+    Test that updating or deleting a task that does not exist yields 404.
+    """
+    missing_id = 987_654_321
+    update = {"status": "completed"}
+    assert client.put(f"/task/{missing_id}", json=update).status_code == 404
+    assert client.patch(f"/task/{missing_id}", json=update).status_code == 404
+    assert client.patch(f"/task/{missing_id}", json={}).status_code == 404
+    assert client.delete(f"/task/{missing_id}").status_code == 404
+
+
+def test_task_endpoints_declare_response_models():
+    """
+    Test that task responses are typed and carry exactly the TaskRead fields.
+    """
+    payload = {
+        "description": "Typed response",
+        "due_date": "2027-07-21",
+        "status": "pending",
+        "title": "[TEST_TEST_TEST]",
+    }
+    created = client.post("/task/", json=payload).json()
+    fields = {"id", "title", "description", "status", "due_date", "version"}
+    assert set(created) == fields
+    assert set(client.get(f"/task/{created['id']}").json()) == fields
+
+    page = client.get("/task/", params={"after": created["id"] - 1, "limit": 1})
+    assert page.json() == {"items": [created], "next_cursor": None}
+
+    paths = client.get("/openapi.json").json()["paths"]
+    for path, method in (("/task/", "get"), ("/task/{task_id}", "get")):
+        schema = paths[path][method]["responses"]["200"]["content"]
+        assert schema["application/json"]["schema"]
+
+
+def test_insert_coalescer_group_commits_concurrent_inserts():
+    """
+    Test that concurrent inserts share one commit and each caller gets its row.
+    """
+    commits = []
+
+    def count_commit(conn):
+        commits.append(conn)
+
+    rows = [
+        {"title": f"Coalesced task {i}", "description": None, "status": Status.PENDING}
+        for i in range(5)
+    ]
+
+    async def insert_all(coalescer):
+        return await asyncio.gather(*(coalescer.insert(row) for row in rows))
+
+    event.listen(engine.sync_engine, "commit", count_commit)
+    try:
+        # A full batch is written at once, without waiting for the window.
+        full = InsertCoalescer(Task, TestingSessionLocal, 5, max_delay=60)
+        created = asyncio.run(insert_all(full))
+        assert len(commits) == 1
+        # Otherwise the batch is written when the window closes.
+        windowed = InsertCoalescer(Task, TestingSessionLocal, 100, max_delay=0.01)
+        created += asyncio.run(insert_all(windowed))
+        assert len(commits) == 2
+    finally:
+        event.remove(engine.sync_engine, "commit", count_commit)
+
+    assert [task["title"] for task in created] == [row["title"] for row in rows] * 2
+    assert len({task["id"] for task in created}) == 10
+    assert all(task["version"] == 1 for task in created)
+
+
+def test_post_task_through_coalescer(monkeypatch):
+    """
+    Test that creates answer with their own stored task when coalescing is on.
+    """
+    coalescer = InsertCoalescer(Task, TestingSessionLocal, 10, max_delay=0.001)
+    monkeypatch.setitem(
+        app.dependency_overrides, get_insert_coalescer, lambda: coalescer
+    )
+    payload = {
+        "description": "Group committed",
+        "due_date": "2027-07-21",
+        "status": "pending",
+        "title": "[TEST_TEST_TEST]",
+    }
+    response = client.post("/task/", json=payload)
+    assert response.status_code == 201
+    created = response.json()
+    assert created["description"] == "Group committed"
+    assert client.get(f"/task/{created['id']}").json() == created
+
+
+def test_task_reads_with_field_projection():
+    """
+    Test that `fields` trims task reads and rejects unknown field names.
+    """
+    payload = {
+        "description": "Not sent to narrow clients",
+        "due_date": "2027-07-21",
+        "status": "pending",
+        "title": "[TEST_TEST_TEST]",
+    }
+    created = client.post("/task/", json=payload).json()
+    narrow = {"id": created["id"], "title": created["title"], "status": "pending"}
+
+    # Served from the database, then from the cached full task.
+    for _ in range(2):
+        response = client.get(
+            f"/task/{created['id']}", params={"fields": "id,title,status"}
+        )
+        assert response.json() == narrow
+    assert (
+        response.headers["ETag"] != client.get(f"/task/{created['id']}").headers["ETag"]
+    )
+    assert (
+        client.get(
+            f"/task/{created['id']}",
+            params={"fields": "id,title,status"},
+            headers={"If-None-Match": response.headers["ETag"]},
+        ).status_code
+        == 304
+    )
+
+    page = client.get(
+        "/task/", params={"after": created["id"] - 1, "limit": 1, "fields": "title"}
+    ).json()
+    assert page == {"items": [{"title": created["title"]}], "next_cursor": None}
+
+    for fields in ("id,secret", ""):
+        assert client.get("/task/", params={"fields": fields}).status_code == 422
+        response = client.get(f"/task/{created['id']}", params={"fields": fields})
+        assert response.status_code == 422
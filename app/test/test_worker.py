@@ -0,0 +1,208 @@
+"""
+Tests for the task worker.
+"""
+
+import datetime
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from ..database import Base, engine_options
+from ..models import Status, Task
+from ..worker import TaskJob, Worker, load_handler, log_handler
+
+
+@pytest.fixture(name="session_factory")
+def fixture_session_factory():
+    """
+    Session factory of a fresh in-memory database with ten pending tasks.
+    """
+    worker_engine = create_engine(
+        "sqlite://", poolclass=StaticPool, **engine_options("sqlite://")
+    )
+    Base.metadata.create_all(worker_engine)
+    factory = sessionmaker(worker_engine)
+    with factory() as session, session.begin():
+        session.add_all(
+            Task(title=f"Worker task {i}", status=Status.PENDING) for i in range(10)
+        )
+    yield factory
+    worker_engine.dispose()
+
+
+def _statuses(session_factory):
+    with session_factory() as session:
+        return dict(session.execute(select(Task.id, Task.status)).tuples().all())
+
+
+TEST_DB_URL = os.getenv("TEST_SQLALCHEMY_DATABASE_URI", "sqlite://")
+
+
+def test_successive_claims_are_disjoint(session_factory):
+    """
+    Test that alternating claims of two workers never hand out the same task
+    twice. The claims run one after the other; claims racing for the same rows
+    are covered by `test_concurrent_claims_are_disjoint` on PostgreSQL.
+    """
+    workers = [Worker(log_handler, None, 3, session_factory) for _ in range(2)]
+    claimed = []
+    while batch := workers[len(claimed) % 2].claim(3):
+        claimed.append(batch)
+
+    ids = [job.id for batch in claimed for job in batch]
+    assert sorted(ids) == sorted(set(ids)) and len(ids) == 10
+    assert set(_statuses(session_factory).values()) == {Status.IN_PROGRESS}
+
+
+@pytest.mark.skipif(
+    make_url(TEST_DB_URL).get_backend_name() != "postgresql",
+    reason="FOR UPDATE SKIP LOCKED needs PostgreSQL",
+)
+def test_concurrent_claims_are_disjoint():
+    """
+    Test that workers claiming at the same time never share a task.
+    """
+    pg_engine = create_engine(TEST_DB_URL, **engine_options(TEST_DB_URL))
+    factory = sessionmaker(pg_engine)
+    with factory() as session, session.begin():
+        session.add_all(
+            Task(title=f"Concurrent claim {i}", status=Status.PENDING)
+            for i in range(40)
+        )
+    workers = [Worker(log_handler, None, 5, factory) for _ in range(4)]
+    barrier = threading.Barrier(len(workers))
+
+    def claim_all(worker):
+        barrier.wait()
+        claimed = []
+        while batch := worker.claim(5):
+            claimed += [job.id for job in batch]
+        return claimed
+
+    with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+        ids = [
+            task_id for claimed in pool.map(claim_all, workers) for task_id in claimed
+        ]
+    try:
+        assert len(ids) == len(set(ids)) >= 40
+    finally:
+        workers[0].release(ids)
+        pg_engine.dispose()
+
+
+def _age_claims(session_factory):
+    an_hour_ago = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        hours=1
+    )
+    with session_factory() as session, session.begin():
+        session.execute(
+            update(Task)
+            .where(Task.claimed_at.is_not(None))
+            .values(claimed_at=an_hour_ago)
+        )
+
+
+def test_expired_leases_are_reclaimed(session_factory):
+    """
+    Test that tasks of a dead worker return to PENDING once their lease expires,
+    while live workers keep theirs by renewing and API-set IN_PROGRESS stays.
+    """
+    dead = Worker(log_handler, None, 3, session_factory, lease_seconds=60)
+    dead_ids = {job.id for job in dead.claim(3)}
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        live = Worker(
+            lambda job: release.wait(5), executor, 2, session_factory, lease_seconds=60
+        )
+        live.run_once(timeout=0)
+        with session_factory() as session, session.begin():
+            session.add(Task(title="Set by the API", status=Status.IN_PROGRESS))
+
+        assert live.reclaim_expired() == 0
+        _age_claims(session_factory)
+        live.renew_leases()
+        assert live.reclaim_expired() == 3
+        release.set()
+        live.drain()
+
+    statuses = _statuses(session_factory)
+    assert {statuses[task_id] for task_id in dead_ids} == {Status.PENDING}
+    assert list(statuses.values()).count(Status.COMPLETED) == 2
+    assert list(statuses.values()).count(Status.IN_PROGRESS) == 1
+    assert {job.id for job in dead.claim(3)} == dead_ids
+
+
+class BreakingExecutor(ThreadPoolExecutor):
+    """
+    Thread pool that breaks after its first task, like a process pool whose
+    worker process died.
+    """
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.submitted = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        if self.submitted:
+            raise BrokenProcessPool("A worker process terminated abruptly")
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+def test_unsubmitted_claims_are_released(session_factory):
+    """
+    Test that claimed tasks the pool refused go back to PENDING.
+    """
+    with BreakingExecutor() as executor:
+        worker = Worker(log_handler, executor, 4, session_factory)
+        with pytest.raises(BrokenProcessPool):
+            worker.run_once(timeout=1)
+        worker.drain()
+
+    statuses = _statuses(session_factory)
+    assert statuses[1] == Status.COMPLETED
+    assert set(statuses[task_id] for task_id in range(2, 11)) == {Status.PENDING}
+
+
+def test_worker_records_outcomes(session_factory):
+    """
+    Test that handled tasks complete, failing ones fail, and versions bump once.
+    """
+    seen = []
+    lock = threading.Lock()
+
+    def handler(job: TaskJob):
+        with lock:
+            seen.append(job.id)
+        if job.id % 3 == 0:
+            raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        worker = Worker(handler, executor, 4, session_factory, poll_interval=0)
+        while worker.run_once(timeout=1):
+            pass
+        worker.drain()
+
+    statuses = _statuses(session_factory)
+    assert sorted(seen) == sorted(statuses)
+    for task_id, task_status in statuses.items():
+        expected = Status.FAILED if task_id % 3 == 0 else Status.COMPLETED
+        assert task_status == expected
+    with session_factory() as session:
+        assert set(session.scalars(select(Task.version))) == {3}
+
+
+def test_load_handler():
+    """
+    Test that handlers are resolved from "module:function" paths.
+    """
+    assert load_handler("app.worker:log_handler") is log_handler
+    with pytest.raises(ValueError):
+        load_handler("app.worker")
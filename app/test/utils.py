@@ -5,15 +5,16 @@ This module sets up a test database, provides a database override dependency,
 and initializes a FastAPI TestClient for use in test cases.
 """
 
+import asyncio
 import os
 
 from dotenv import load_dotenv
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
 
-from ..database import Base
+from ..database import Base, engine_options, to_async_url
 from ..main import app
 
 load_dotenv()
@@ -22,24 +23,37 @@ db_url = os.getenv("TEST_SQLALCHEMY_DATABASE_URI")
 if db_url is None:
     raise RuntimeError("TEST_SQLALCHEMY_DATABASE_URI environment variable is not set")
 
-engine = create_engine(db_url, poolclass=StaticPool)
+# TestClient runs every request on a fresh event loop: an in-memory SQLite
+# database has to stay on one connection, other drivers must not reuse
+# connections bound to a previous loop.
+poolclass = StaticPool if make_url(db_url).get_backend_name() == "sqlite" else NullPool
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base.metadata.create_all(bind=engine)
+engine = create_async_engine(
+    to_async_url(db_url), poolclass=poolclass, **engine_options(db_url)
+)
 
+TestingSessionLocal = async_sessionmaker(
+    engine, autoflush=False, expire_on_commit=False
+)
 
-def override_get_db():
+
+async def _create_all():
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+
+asyncio.run(_create_all())
+
+
+async def override_get_db():
     """
-    Dependency override for providing a SQLAlchemy session
+    Dependency override for providing a SQLAlchemy asyncio session
     connected to the test database for use in tests.
     Yields:
-        db (Session): SQLAlchemy session for the test database.
+        db (AsyncSession): SQLAlchemy session for the test database.
     """
-    db = TestingSessionLocal()
-    try:
+    async with TestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 client = TestClient(app)
@@ -0,0 +1,369 @@
+"""
+Task worker: executes pending tasks with a pluggable handler.
+
+Workers claim pending tasks with one statement,
+
+    UPDATE task SET status = 'IN_PROGRESS'
+    WHERE id IN (SELECT id FROM task WHERE status = 'PENDING'
+                 ORDER BY id LIMIT :n FOR UPDATE SKIP LOCKED)
+    RETURNING ...
+
+so concurrent workers on any number of processes or nodes skip the rows another
+worker is claiming instead of waiting for them, and a task is only ever handed
+to one worker. Claimed tasks run on a thread or process pool; each outcome is
+written back as IN_PROGRESS -> COMPLETED or IN_PROGRESS -> FAILED, guarded by
+the current status so a transition happens at most once.
+
+SQLite has no row locks; there the claim statement is atomic because SQLite
+serializes writers.
+
+A claim is a lease: the claim stamps `claimed_at`, and a running worker renews
+the stamp of its tasks in flight every third of `lease_seconds`. Tasks whose
+lease expired, because the worker that claimed them died or hung, are put back
+to PENDING by `reclaim_expired`, which every worker runs on the same schedule,
+and are claimed again. A handler can therefore run more than once for a task
+(at-least-once delivery) and should be idempotent. Claimed tasks that could not
+be submitted to the pool, e.g. because a process pool broke, are put back to
+PENDING right away. Tasks set IN_PROGRESS through the API have no lease and are
+left alone.
+
+Status changes made by a worker process reach the API's task cache through its
+TTL.
+
+Classes:
+    TaskJob: Picklable snapshot of a claimed task passed to handlers.
+    Worker: Claims tasks and runs them on an executor.
+
+Key components:
+    - `TaskHandler`: Signature of a handler, `handler(job) -> None`; raising marks
+      the task FAILED.
+    - `load_handler`: Resolves a handler from a "module:function" path.
+    - `main`: Command line entry point, `python -m app.worker --help`.
+"""
+
+import argparse
+import dataclasses
+import datetime
+import importlib
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from .database import SessionLocal
+from .models import Status, Task
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+@dataclasses.dataclass(frozen=True)
+class TaskJob:
+    """
+    Snapshot of a claimed task, safe to send to another process.
+
+    Attributes:
+        id (int): ID of the task.
+        title (str | None): Title of the task.
+        description (str | None): Description of the task.
+        due_date (datetime.date | None): Due date of the task.
+    """
+
+    id: int
+    title: Optional[str]
+    description: Optional[str]
+    due_date: Optional[datetime.date]
+
+
+TaskHandler = Callable[[TaskJob], None]
+
+
+def log_handler(job: TaskJob) -> None:
+    """
+    Example handler that only logs the task it receives.
+
+    Args:
+        job (TaskJob): The claimed task.
+    """
+    logger.info("Handling task %s: %s", job.id, job.title)
+
+
+def load_handler(path: str) -> TaskHandler:
+    """
+    Resolve a handler from a "package.module:function" path.
+
+    Args:
+        path (str): Import path of a module-level callable; module-level
+            functions can be sent to a process pool.
+
+    Returns:
+        TaskHandler: The handler.
+    """
+    module_name, _, attribute = path.partition(":")
+    if not attribute:
+        raise ValueError(f"Handler path must look like 'module:function', got {path}")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class Worker:  # pylint: disable=too-many-instance-attributes
+    """
+    Claims pending tasks and runs them on an executor.
+
+    At most `concurrency` tasks are in flight; new tasks are claimed as soon as
+    a slot frees up, so the pool stays busy without claiming work it cannot
+    start.
+
+    Attributes:
+        handler (TaskHandler): Function executing one task.
+        executor (Executor): Thread or process pool running the handler.
+        concurrency (int): Maximum number of tasks in flight.
+        session_factory (sessionmaker): Factory of the sessions used to claim
+            tasks and record their outcome.
+        poll_interval (float): Seconds to wait when no task is pending.
+        lease_seconds (float | None): Seconds a claim stays valid without
+            renewal; None disables renewal and reclaiming.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        handler: TaskHandler,
+        executor: Executor,
+        concurrency: int,
+        session_factory: sessionmaker = SessionLocal,
+        poll_interval: float = 1.0,
+        lease_seconds: Optional[float] = 300.0,
+    ):
+        self.handler = handler
+        self.executor = executor
+        self.concurrency = concurrency
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._in_flight: Dict[Future, int] = {}
+        self._stop = threading.Event()
+        self._next_lease_check = 0.0
+
+    def claim(self, limit: int) -> List[TaskJob]:
+        """
+        Atomically move up to `limit` pending tasks to IN_PROGRESS.
+
+        Args:
+            limit (int): Maximum number of tasks to claim.
+
+        Returns:
+            list[TaskJob]: The claimed tasks, ordered by ID.
+        """
+        pending = (
+            select(Task.id)
+            .where(Task.status == Status.PENDING)
+            .order_by(Task.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        claim_statement = (
+            update(Task)
+            .where(Task.id.in_(pending.scalar_subquery()))
+            .where(Task.status == Status.PENDING)
+            .values(status=Status.IN_PROGRESS, claimed_at=_utcnow())
+            .returning(Task.id, Task.title, Task.description, Task.due_date)
+        )
+        with self.session_factory() as session, session.begin():
+            rows = session.execute(claim_statement).all()
+        return sorted((TaskJob(*row) for row in rows), key=lambda job: job.id)
+
+    def release(self, task_ids: List[int]) -> None:
+        """
+        Put claimed tasks that will not run here back to PENDING.
+
+        Args:
+            task_ids (list[int]): IDs of tasks claimed by this worker.
+        """
+        with self.session_factory() as session, session.begin():
+            session.execute(
+                update(Task)
+                .where(Task.id.in_(task_ids))
+                .where(Task.status == Status.IN_PROGRESS)
+                .values(status=Status.PENDING, claimed_at=None)
+            )
+
+    def renew_leases(self) -> None:
+        """Restart the lease of every task in flight."""
+        task_ids = list(self._in_flight.values())
+        if not task_ids:
+            return
+        with self.session_factory() as session, session.begin():
+            session.execute(
+                update(Task)
+                .where(Task.id.in_(task_ids))
+                .where(Task.status == Status.IN_PROGRESS)
+                # Bookkeeping only: keep the row version (and the ETag) as is.
+                .values(claimed_at=_utcnow(), version=Task.version)
+            )
+
+    def reclaim_expired(self) -> int:
+        """
+        Put tasks whose lease expired back to PENDING.
+
+        Returns:
+            int: Number of tasks reclaimed.
+        """
+        if self.lease_seconds is None:
+            return 0
+        expired = _utcnow() - datetime.timedelta(seconds=self.lease_seconds)
+        with self.session_factory() as session, session.begin():
+            reclaimed = session.execute(
+                update(Task)
+                .where(Task.status == Status.IN_PROGRESS)
+                .where(Task.claimed_at < expired)
+                .values(status=Status.PENDING, claimed_at=None)
+            ).rowcount
+        if reclaimed:
+            logger.warning("Reclaimed %d task(s) whose lease expired", reclaimed)
+        return reclaimed
+
+    def _maintain_leases(self) -> None:
+        """Renew own leases and reclaim expired ones, every third of the lease."""
+        now = time.monotonic()
+        if self.lease_seconds is None or now < self._next_lease_check:
+            return
+        self._next_lease_check = now + self.lease_seconds / 3
+        self.renew_leases()
+        self.reclaim_expired()
+
+    def _lease_wait(self) -> Optional[float]:
+        """Longest wait for a task that keeps the leases renewed."""
+        return None if self.lease_seconds is None else self.lease_seconds / 3
+
+    def _finish(self, session: Session, task_ids: List[int], outcome: Status) -> None:
+        if task_ids:
+            session.execute(
+                update(Task)
+                .where(Task.id.in_(task_ids))
+                .where(Task.status == Status.IN_PROGRESS)
+                .values(status=outcome)
+            )
+
+    def _record(self, done: List[Future]) -> None:
+        """Write the outcome of finished tasks in one transaction."""
+        completed: List[int] = []
+        failed: List[int] = []
+        for future in done:
+            task_id = self._in_flight.pop(future)
+            error = future.exception()
+            if error is None:
+                completed.append(task_id)
+            else:
+                logger.error("Task %s failed: %r", task_id, error)
+                failed.append(task_id)
+
+        with self.session_factory() as session, session.begin():
+            self._finish(session, completed, Status.COMPLETED)
+            self._finish(session, failed, Status.FAILED)
+
+    def run_once(self, timeout: Optional[float] = None) -> int:
+        """
+        Fill the free slots with newly claimed tasks and record finished ones.
+
+        Args:
+            timeout (float | None): Seconds to wait for a task to finish; keep
+                it below a third of the lease so leases are renewed in time.
+
+        Returns:
+            int: Number of tasks claimed.
+        """
+        self._maintain_leases()
+        free = self.concurrency - len(self._in_flight)
+        jobs = self.claim(free) if free > 0 else []
+        for index, job in enumerate(jobs):
+            try:
+                future = self.executor.submit(self.handler, job)
+            except Exception:
+                # E.g. BrokenProcessPool: nobody will run the rest of the batch.
+                self.release([unsubmitted.id for unsubmitted in jobs[index:]])
+                raise
+            self._in_flight[future] = job.id
+
+        if self._in_flight:
+            done, _ = wait(
+                self._in_flight, timeout=timeout, return_when=FIRST_COMPLETED
+            )
+            if done:
+                self._record(list(done))
+        return len(jobs)
+
+    def drain(self) -> None:
+        """Wait for every task in flight and record its outcome."""
+        while self._in_flight:
+            self._maintain_leases()
+            done, _ = wait(
+                self._in_flight,
+                timeout=self._lease_wait(),
+                return_when=FIRST_COMPLETED,
+            )
+            if done:
+                self._record(list(done))
+
+    def run(self) -> None:
+        """Process tasks until `stop()` is called, then drain the pool."""
+        while not self._stop.is_set():
+            claimed = self.run_once(timeout=self.poll_interval)
+            if not claimed and not self._in_flight:
+                self._stop.wait(self.poll_interval)
+        self.drain()
+
+    def stop(self) -> None:
+        """Stop claiming new tasks; tasks in flight still finish."""
+        self._stop.set()
+
+
+def main() -> None:
+    """Run a worker from the command line until SIGINT / SIGTERM."""
+    parser = argparse.ArgumentParser(description="Execute pending tasks.")
+    parser.add_argument(
+        "--handler",
+        default="app.worker:log_handler",
+        help="Handler as 'module:function' (default: %(default)s)",
+    )
+    parser.add_argument("--pool", choices=("thread", "process"), default="thread")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=300.0,
+        help="Seconds before a task claimed by a dead worker is reclaimed",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    pool_class = ThreadPoolExecutor if args.pool == "thread" else ProcessPoolExecutor
+    with pool_class(max_workers=args.concurrency) as executor:
+        worker = Worker(
+            load_handler(args.handler),
+            executor,
+            args.concurrency,
+            poll_interval=args.poll_interval,
+            lease_seconds=args.lease_seconds,
+        )
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_args: worker.stop())
+        worker.run()
+
+
+if __name__ == "__main__":
+    main()
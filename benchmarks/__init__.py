@@ -0,0 +1,34 @@
+"""Performance benchmarks for the task API and the ingestion scripts.
+
+Helpers shared by the benchmarks that need a database:
+
+- `argument_parser`: parser with the common `--database-url` option,
+- `benchmark_database`: yields that URL, or a temporary SQLite file when none
+  was given.
+"""
+
+import argparse
+import contextlib
+import tempfile
+from typing import Iterator, Optional
+
+
+def argument_parser(description: str) -> argparse.ArgumentParser:
+    """Return an argument parser with the shared `--database-url` option."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Synchronous database URL (default: temporary SQLite file)",
+    )
+    return parser
+
+
+@contextlib.contextmanager
+def benchmark_database(database_url: Optional[str]) -> Iterator[str]:
+    """Yield `database_url`, or the URL of a temporary SQLite file removed on exit."""
+    if database_url:
+        yield database_url
+        return
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        yield f"sqlite:///{tmp_dir}/bench.db"
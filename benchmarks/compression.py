@@ -0,0 +1,115 @@
+"""Microbenchmark: CPU time vs bytes saved of gzip levels and brotli qualities.
+
+Compresses a JSON page of tasks (as returned by `GET /task/`) with the
+encoders used by `app.middleware.CompressionMiddleware` and reports, per level:
+
+- the compressed size and the ratio to the identity body,
+- the CPU time spent compressing one response,
+- the break-even bandwidth: on links slower than this, the transfer time saved
+  by the smaller body outweighs the compression time, so compressing pays off.
+
+The middleware defaults (GZIP_LEVEL=5, BROTLI_QUALITY=4) sit where the ratio
+curve flattens while the CPU time is still close to the fastest levels.
+
+Usage:
+    python -m benchmarks.compression
+    python -m benchmarks.compression --rows 200 --repeat 50
+"""
+
+import argparse
+import datetime
+import os
+import time
+import zlib
+from typing import Callable, List, Tuple
+
+try:
+    import brotli  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+GZIP_LEVELS = (1, 5, 6, 9)
+BROTLI_QUALITIES = (1, 4, 5, 11)
+
+
+def task_page(rows: int) -> bytes:
+    """Render a page of `rows` tasks as the task list endpoint does."""
+    # pylint: disable=import-outside-toplevel
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    from app.models import Status
+    from app.routers.task import TaskPage, TaskRead
+
+    items = [
+        TaskRead(
+            id=i,
+            title=f"Benchmark task {i}",
+            description=f"Compressed by benchmarks.compression, row {i}",
+            status=Status.PENDING,
+            due_date=datetime.date(2027, 7, 21),
+            version=1,
+        )
+        for i in range(1, rows + 1)
+    ]
+    return TaskPage(items=items, next_cursor=rows).model_dump_json().encode()
+
+
+def _gzip(level: int) -> Callable[[bytes], bytes]:
+    def compress(body: bytes) -> bytes:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+        return compressor.compress(body) + compressor.flush()
+
+    return compress
+
+
+def _brotli(quality: int) -> Callable[[bytes], bytes]:
+    def compress(body: bytes) -> bytes:
+        return brotli.compress(body, mode=brotli.MODE_TEXT, quality=quality, lgwin=22)
+
+    return compress
+
+
+def measure(
+    compress: Callable[[bytes], bytes], body: bytes, repeat: int
+) -> Tuple[int, float]:
+    """Return the compressed size and the mean CPU seconds per compression."""
+    size = len(compress(body))  # warm-up
+    started = time.process_time()
+    for _ in range(repeat):
+        compress(body)
+    return size, (time.process_time() - started) / repeat
+
+
+def main() -> None:
+    """Compress the page at each level and print the trade-off table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    body = task_page(args.rows)
+    variants: List[Tuple[str, Callable[[bytes], bytes]]] = [
+        (f"gzip {level}", _gzip(level)) for level in GZIP_LEVELS
+    ]
+    if brotli is not None:
+        variants += [
+            (f"br {quality}", _brotli(quality)) for quality in BROTLI_QUALITIES
+        ]
+    else:
+        print("brotli is not installed, only gzip is measured")
+
+    print(f"identity body: {len(body)} bytes ({args.rows} tasks)")
+    print(
+        f"{'encoding':<10}{'bytes':>9}{'ratio':>8}{'cpu ms':>9}"
+        f"{'MB/s':>9}{'break-even Mbit/s':>19}"
+    )
+    for name, compress in variants:
+        size, cpu = measure(compress, body, args.repeat)
+        saved_bits = (len(body) - size) * 8
+        print(
+            f"{name:<10}{size:>9}{len(body) / size:>7.1f}x{cpu * 1000:>9.3f}"
+            f"{len(body) / cpu / 1e6:>9.0f}{saved_bits / cpu / 1e6:>19.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Microbenchmark: per-request overhead of the timing/logging middleware.
+
+Compares three stacks in front of the same trivial endpoint:
+
+- no middleware (baseline),
+- the previous stack: `add_process_time_header` and `log_requests` as two
+  `BaseHTTPMiddleware` dispatchers with a synchronous log handler,
+- `RequestTimingMiddleware` logging through its queue handler.
+
+Requests are driven straight through the ASGI interface (no sockets, no HTTP
+client), so the difference to the baseline is the middleware cost. Log output
+goes to os.devnull in every variant.
+
+Usage:
+    python -m benchmarks.middleware_overhead
+    python -m benchmarks.middleware_overhead --requests 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware import RequestTimingMiddleware, log_listener
+
+legacy_logger = logging.getLogger("benchmarks.legacy_middleware")
+
+
+async def legacy_add_process_time_header(request: Request, call_next):
+    """The former `add_process_time_header` dispatcher."""
+    start_time = time.perf_counter()
+    response = await call_next(request)
+    response.headers["X-Process-Time"] = str(time.perf_counter() - start_time)
+    return response
+
+
+async def legacy_log_requests(request: Request, call_next):
+    """The former `log_requests` dispatcher."""
+    start_time = datetime.now()
+    method = request.method
+    path = request.url.path
+    client_host = request.client.host if request.client else "unknown"
+    legacy_logger.info(
+        "Incoming request - Method: %s, Path: %s, Query: %s, Client: %s",
+        method,
+        path,
+        dict(request.query_params),
+        client_host,
+    )
+    response = await call_next(request)
+    legacy_logger.info(
+        "Request completed - Method: %s, Path: %s, Status: %s, Duration: %.2fms",
+        method,
+        path,
+        response.status_code,
+        (datetime.now() - start_time).total_seconds() * 1000,
+    )
+    return response
+
+
+def build_app(configure: Callable[[FastAPI], None]) -> FastAPI:
+    """Build an app with one plain-text endpoint and the given middleware."""
+    bench_app = FastAPI()
+
+    @bench_app.get("/ping")
+    def ping():
+        return PlainTextResponse("pong")
+
+    configure(bench_app)
+    return bench_app
+
+
+def _legacy_stack(bench_app: FastAPI) -> None:
+    bench_app.add_middleware(
+        BaseHTTPMiddleware, dispatch=legacy_add_process_time_header
+    )
+    bench_app.add_middleware(BaseHTTPMiddleware, dispatch=legacy_log_requests)
+
+
+def _asgi_stack(bench_app: FastAPI) -> None:
+    bench_app.add_middleware(RequestTimingMiddleware)
+
+
+async def measure(bench_app: FastAPI, requests: int) -> float:
+    """Return the mean time per request in microseconds."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"q=1",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message):
+        return None
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await bench_app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def main() -> None:
+    """Run the variants and print the per-request cost of each."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    # Left open: the queue listener thread may still be writing at exit.
+    devnull = open(  # pylint: disable=consider-using-with
+        os.devnull, "w", encoding="utf-8"
+    )
+    legacy_logger.addHandler(logging.StreamHandler(devnull))
+    legacy_logger.setLevel(logging.INFO)
+    legacy_logger.propagate = False
+    for handler in log_listener.handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(devnull)
+
+    variants: Dict[str, FastAPI] = {
+        "no middleware": build_app(lambda _app: None),
+        "2x BaseHTTPMiddleware": build_app(_legacy_stack),
+        "RequestTimingMiddleware": build_app(_asgi_stack),
+    }
+
+    async def run_all() -> Dict[str, float]:
+        results = {}
+        for name, bench_app in variants.items():
+            await measure(bench_app, min(args.requests, 500))  # warm-up
+            results[name] = await measure(bench_app, args.requests)
+        return results
+
+    results = asyncio.run(run_all())
+
+    baseline = results["no middleware"]
+    print(f"{args.requests} requests per variant")
+    print(f"{'variant':<26}{'us/request':>12}{'overhead us':>13}")
+    for name, per_request in results.items():
+        print(f"{name:<26}{per_request:>12.1f}{per_request - baseline:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Microbenchmark: per-row cost of rendering task lists as JSON.
+
+Renders a page of `Task` ORM objects (as returned by `GET /task/`) through
+three FastAPI routes that differ only in how the response is produced:
+
+- no response model: FastAPI falls back to `jsonable_encoder`, which reflects
+  over every ORM object (the former behaviour of the task endpoints),
+- `response_model=TaskPage` with an orjson response class: one pydantic
+  validation of the page, then a Python dict rendered by `orjson.dumps`,
+- `response_model=TaskPage` with the default response class: one pydantic
+  validation, serialized straight to JSON bytes by pydantic-core.
+
+Requests are driven through the ASGI interface, no sockets involved.
+
+Usage:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --rows 500 --requests 200
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import time
+from typing import Any, Dict
+
+import httpx
+import orjson
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)  # pylint: disable=no-member
+
+
+def build_app(rows: int) -> FastAPI:
+    """Build an app serving the same page of tasks through each variant."""
+    # pylint: disable=import-outside-toplevel
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    from app.models import Status, Task
+    from app.routers.task import TaskPage
+
+    tasks = [
+        Task(
+            id=i,
+            title=f"Benchmark task {i}",
+            description="Serialized by benchmarks.serialization",
+            status=Status.PENDING,
+            due_date=datetime.date(2027, 7, 21),
+            version=1,
+        )
+        for i in range(1, rows + 1)
+    ]
+    page: Dict[str, Any] = {"items": tasks, "next_cursor": None}
+    bench_app = FastAPI()
+
+    @bench_app.get("/encoder")
+    async def encoder():
+        return page
+
+    @bench_app.get("/orjson", response_model=TaskPage, response_class=OrjsonResponse)
+    async def orjson_class():
+        return page
+
+    @bench_app.get("/pydantic", response_model=TaskPage)
+    async def pydantic_core():
+        return page
+
+    return bench_app
+
+
+async def measure(bench_app: FastAPI, path: str, requests: int) -> float:
+    """Return the mean time per request in microseconds."""
+    transport = httpx.ASGITransport(app=bench_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as cli:
+        for _ in range(min(requests, 10)):  # warm-up
+            (await cli.get(path)).raise_for_status()
+        started = time.perf_counter()
+        for _ in range(requests):
+            await cli.get(path)
+        return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def main() -> None:
+    """Run the variants and print the per-row cost of each."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    bench_app = build_app(args.rows)
+    variants = {
+        "jsonable_encoder": "/encoder",
+        "response_model + orjson": "/orjson",
+        "response_model": "/pydantic",
+    }
+
+    async def run_all() -> Dict[str, float]:
+        return {
+            name: await measure(bench_app, path, args.requests)
+            for name, path in variants.items()
+        }
+
+    results = asyncio.run(run_all())
+
+    baseline = results["jsonable_encoder"]
+    print(f"{args.requests} requests per variant, {args.rows} tasks per response")
+    print(f"{'variant':<26}{'us/request':>12}{'us/row':>9}{'speed-up':>10}")
+    for name, per_request in results.items():
+        print(
+            f"{name:<26}{per_request:>12.0f}{per_request / args.rows:>9.2f}"
+            f"{baseline / per_request:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,138 @@
-"""Shared database configuration for SQLAlchemy ORM."""
+"""Shared database configuration for SQLAlchemy ORM.
+
+Engines are kept in a process-wide registry keyed by database URL, so every
+package that talks to the same database shares one connection pool. Pool
+parameters are read from the environment:
+
+    DB_POOL_SIZE (5), DB_MAX_OVERFLOW (10), DB_POOL_TIMEOUT (30 seconds),
+    DB_POOL_RECYCLE (1800 seconds, -1 disables), DB_POOL_PRE_PING (true).
+
+Engines are instrumented by `core.db.instrumentation` when DB_INSTRUMENTATION
+is set. Pools are disposed with `dispose_engines()` / `dispose_async_engines()` on
+shutdown. A forked child process drops the connections inherited from its
+parent (without closing them) and opens its own.
+"""
 
 from typing import Optional, Dict, Any
 import os
+import threading
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
+from core.db import instrumentation
+
+_engines: Dict[str, Engine] = {}
+_async_engines: Dict[str, AsyncEngine] = {}
+_registry_lock = threading.Lock()
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def _registry_key(url: str | URL) -> str:
+    """Full URL string (password included) so different credentials never share a pool."""
+    return make_url(url).render_as_string(hide_password=False)
+
+
+def pool_options(url: str | URL) -> Dict[str, Any]:
+    """Connection pool keyword arguments for `create_engine`, from the environment.
+
+    Size, overflow and timeout only apply to queue pools, so they are left
+    out for SQLite, which uses a single-connection pool for in-memory databases.
+
+    Args:
+        url: Database URL the pool is created for
+
+    Returns:
+        Keyword arguments for `create_engine` / `create_async_engine`
+    """
+    options: Dict[str, Any] = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in _TRUE_VALUES,
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        )
+    return options
+
+
+def get_engine(db_url: str | URL, **kwargs: Any) -> Engine:
+    """Return the shared engine of a database, creating it on first use.
+
+    Args:
+        db_url: Database URL
+        **kwargs: Extra `create_engine` arguments; only used by the call that
+            creates the engine
+
+    Returns:
+        The engine registered for `db_url`
+    """
+    key = _registry_key(db_url)
+    with _registry_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = create_engine(db_url, **{**pool_options(db_url), **kwargs})
+            if instrumentation.ENABLED:
+                instrumentation.instrument_engine(engine)
+            _engines[key] = engine
+        return engine
+
+
+def get_async_engine(db_url: str | URL, **kwargs: Any) -> AsyncEngine:
+    """Return the shared asyncio engine of a database, creating it on first use.
+
+    Args:
+        db_url: Database URL with an asyncio driver
+        **kwargs: Extra `create_async_engine` arguments; only used by the call
+            that creates the engine
+
+    Returns:
+        The asyncio engine registered for `db_url`
+    """
+    key = _registry_key(db_url)
+    with _registry_lock:
+        engine = _async_engines.get(key)
+        if engine is None:
+            engine = create_async_engine(db_url, **{**pool_options(db_url), **kwargs})
+            if instrumentation.ENABLED:
+                instrumentation.instrument_engine(engine.sync_engine)
+            _async_engines[key] = engine
+        return engine
+
+
+def dispose_engines() -> None:
+    """Close the pooled connections of every registered engine."""
+    with _registry_lock:
+        engines = list(_engines.values())
+    for engine in engines:
+        engine.dispose()
+
+
+async def dispose_async_engines() -> None:
+    """Close the pooled connections of every registered asyncio engine."""
+    with _registry_lock:
+        engines = list(_async_engines.values())
+    for engine in engines:
+        await engine.dispose()
+
+
+def _reset_pools_after_fork() -> None:
+    """Forget inherited connections in a child process; the parent still owns them."""
+    for engine in _engines.values():
+        engine.dispose(close=False)
+    for async_engine in _async_engines.values():
+        async_engine.sync_engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
 
 def setup_database(
     schema: str = "public", db_url: Optional[str] = None
@@ -28,7 +154,7 @@ def setup_database(
             "Database URL not provided and SQLALCHEMY_DATABASE_URI not set"
         )
 
-    engine = create_engine(db_url)
+    engine = get_engine(db_url)
     # pylint: disable=invalid-name
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     # pylint: disable=invalid-name
@@ -0,0 +1,188 @@
+"""Opt-in query instrumentation through SQLAlchemy cursor events.
+
+When enabled, every engine handed out by `core.db.base_db` gets
+`before_cursor_execute` / `after_cursor_execute` listeners that:
+
+    - log statements slower than a threshold, with their parameters redacted
+      to their types so no row data ends up in the logs;
+    - count the statements issued inside the active `query_scope` (one HTTP
+      request or one ingestion job) and warn when the same statement shape is
+      repeated many times, the usual sign of an N+1 loop.
+
+Configuration (environment):
+
+    DB_INSTRUMENTATION (off), DB_SLOW_QUERY_MS (200),
+    DB_REPEATED_QUERY_THRESHOLD (10).
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import Counter
+from typing import Any, Dict, Iterator, Optional
+import logging
+import os
+import re
+import time
+import weakref
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Read the settings below from .env even when this module is imported first.
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+ENABLED = os.getenv("DB_INSTRUMENTATION", "false").lower() in _TRUE_VALUES
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+REPEATED_QUERY_THRESHOLD = int(os.getenv("DB_REPEATED_QUERY_THRESHOLD", "10"))
+
+_instrumented: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    """Statements issued inside one `query_scope`.
+
+    Attributes:
+        name: Label of the scope, e.g. "GET /task/{task_id}"
+        count: Number of statements executed
+        duration: Total statement time in seconds
+        shapes: Executions per statement shape (the SQL with bound parameters)
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        """Count one executed statement.
+
+        Args:
+            statement: SQL sent to the cursor
+            duration: Execution time in seconds
+        """
+        self.count += 1
+        self.duration += duration
+        self.shapes[_WHITESPACE.sub(" ", statement).strip()] += 1
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Statement shapes executed at least `threshold` times.
+
+        Args:
+            threshold: Minimum number of executions
+
+        Returns:
+            Execution count per repeated shape
+        """
+        return {
+            shape: count for shape, count in self.shapes.items() if count >= threshold
+        }
+
+
+_current_scope: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_scope", default=None
+)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Replace bound parameter values with their type names.
+
+    Args:
+        parameters: Parameters as passed to the cursor (mapping, sequence, or
+            a list of those for executemany)
+
+    Returns:
+        The same structure with every value replaced by "<type>"
+    """
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"<{len(parameters)} parameter sets>"
+        return [f"<{type(value).__name__}>" for value in parameters]
+    return f"<{type(parameters).__name__}>"
+
+
+def _before_cursor_execute(  # pylint: disable=too-many-arguments
+    _conn, _cursor, _statement, _parameters, context, _executemany
+) -> None:
+    # Kept on the execution context rather than the connection, so a statement
+    # that fails (and never reaches after_cursor_execute) leaves nothing behind.
+    if context is not None:
+        context.query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(  # pylint: disable=too-many-arguments
+    _conn, _cursor, statement, parameters, context, executemany
+) -> None:
+    started = getattr(context, "query_start_time", None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+
+    stats = _current_scope.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    if duration * 1000 >= SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1fms%s): %s | parameters: %s",
+            duration * 1000,
+            ", executemany" if executemany else "",
+            statement,
+            redact_parameters(parameters),
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the cursor listeners to an engine; repeated calls are ignored.
+
+    Args:
+        engine: Engine to instrument; pass `AsyncEngine.sync_engine` for
+            asyncio engines
+    """
+    if engine in _instrumented:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _instrumented.add(engine)
+
+
+@contextmanager
+def query_scope(name: str) -> Iterator[QueryStats]:
+    """Count the statements issued in a block and report repeated shapes.
+
+    Scopes follow the current context, so each asyncio task (and thus each
+    request) gets its own counts. On exit a warning is logged for every shape
+    executed at least `REPEATED_QUERY_THRESHOLD` times.
+
+    Args:
+        name: Label used in the log messages
+
+    Yields:
+        The statistics of the scope
+    """
+    stats = QueryStats(name)
+    token = _current_scope.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_scope.reset(token)
+        for shape, count in stats.repeated(REPEATED_QUERY_THRESHOLD).items():
+            logger.warning(
+                "Possible N+1 in %s: statement executed %d times: %s",
+                name,
+                count,
+                shape,
+            )
+        logger.debug(
+            "%s issued %d queries in %.1fms",
+            name,
+            stats.count,
+            stats.duration * 1000,
+        )
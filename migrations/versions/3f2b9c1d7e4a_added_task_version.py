@@ -0,0 +1,36 @@
+# pylint: disable=invalid-name
+"""Added task version
+
+Revision ID: 3f2b9c1d7e4a
+Revises: 86914b7363ed
+Create Date: 2026-10-17 09:12:44.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3f2b9c1d7e4a"
+down_revision: Union[str, Sequence[str], None] = "86914b7363ed"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.add_column(
+        "task",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.drop_column("task", "version")
+    # ### end Alembic commands ###
@@ -0,0 +1,36 @@
+# pylint: disable=invalid-name
+"""Added task claimed_at
+
+Revision ID: 5b7e2d9c4f18
+Revises: a81c4e0f92d6
+Create Date: 2026-10-17 19:52:31.407615
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5b7e2d9c4f18"
+down_revision: Union[str, Sequence[str], None] = "a81c4e0f92d6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.add_column(
+        "task",
+        sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.drop_column("task", "claimed_at")
+    # ### end Alembic commands ###
@@ -0,0 +1,50 @@
+# pylint: disable=invalid-name
+"""Typed task due date and indexes
+
+Revision ID: a81c4e0f92d6
+Revises: 3f2b9c1d7e4a
+Create Date: 2026-10-17 11:40:05.562870
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a81c4e0f92d6"
+down_revision: Union[str, Sequence[str], None] = "3f2b9c1d7e4a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.alter_column(
+        "task",
+        "due_date",
+        existing_type=sa.DateTime(),
+        type_=sa.Date(),
+        postgresql_using="due_date::date",
+    )
+    op.create_index("ix_task_status_id", "task", ["status", "id"])
+    op.create_index("ix_task_status_due_date", "task", ["status", "due_date"])
+    op.create_index("ix_task_due_date", "task", ["due_date"])
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.drop_index("ix_task_due_date", table_name="task")
+    op.drop_index("ix_task_status_due_date", table_name="task")
+    op.drop_index("ix_task_status_id", table_name="task")
+    op.alter_column(
+        "task",
+        "due_date",
+        existing_type=sa.Date(),
+        type_=sa.DateTime(),
+    )
+    # ### end Alembic commands ###
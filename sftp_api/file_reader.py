@@ -1,29 +1,58 @@
-"""Module for reading various file formats using pandas with automatic reader selection."""
+"""Module for reading various file formats using pandas with automatic reader selection.
 
+`read_file` returns a whole file at once; `iter_file` yields it in chunks of
+at most `chunk_rows` rows, so memory use is bounded by the chunk size instead
+of the file size.
+"""
+
+import io
 from pathlib import Path
 
 import pandas as pd
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+# Readers that need random access to the file
+SEEKABLE_EXTENSIONS = (
+    ".xls",
+    ".xlsx",
+    ".xlsm",
+    ".xlsb",
+    ".odf",
+    ".ods",
+    ".odt",
+    ".parquet",
+    ".pq",
+)
 
 
-def read_file(filename, **kwargs):
+def read_file(filename, file_format=None, **kwargs):
     """
     Reads a file using pandas based on its extension.
 
     Parameters:
-    - filename: str or Path, path to the file to be read
+    - filename: str or Path, path to the file to be read; or an open binary
+      file object (e.g. a remote SFTP file), in which case file_format is required
+    - file_format: extension selecting the reader, e.g. ".csv"; defaults to the
+      extension of filename
     - **kwargs: additional arguments to pass to the pandas reader function
+      (e.g. chunksize=... for CSV and JSON lines, which then return an iterator
+      of DataFrames)
 
     Returns:
     - DataFrame containing the file data
 
+    File objects that cannot seek are read into memory first for Excel and
+    Parquet, whose readers need random access.
+
     Supported extensions:
     - .csv, .tsv, .txt -> pd.read_csv()
     - .xls, .xlsx, .xlsm, .xlsb, .odf, .ods, .odt -> pd.read_excel()
     - .parquet, .pq -> pd.read_parquet()
     - .json -> pd.read_json()
     """
-    file_path = Path(filename)
-    ext = file_path.suffix.lower()
+    if file_format is None:
+        file_format = Path(filename).suffix
+    ext = file_format.lower()
 
     reader_map = {
         # CSV and variants
@@ -65,4 +94,51 @@ def read_file(filename, **kwargs):
     # Merge default_args with user-provided kwargs (user kwargs take precedence)
     final_kwargs = {**default_args, **kwargs}
 
+    if ext in SEEKABLE_EXTENSIONS:
+        filename = _with_random_access(filename)
+
     return reader(filename, **final_kwargs)
+
+
+def iter_file(filename, chunk_rows=100_000, file_format=None, **kwargs):
+    """
+    Reads a file in chunks of at most chunk_rows rows.
+
+    Parameters:
+    - filename: str or Path, path to the file to be read; or an open binary
+      file object, in which case file_format is required
+    - chunk_rows: maximum number of rows per chunk
+    - file_format: extension selecting the reader, e.g. ".csv"; defaults to the
+      extension of filename
+    - **kwargs: additional arguments to pass to the reader function
+
+    Yields:
+    - .csv, .tsv, .txt, .json (JSON lines) -> DataFrame chunks
+    - .parquet, .pq -> pyarrow RecordBatch chunks, read one batch at a time
+      (kwargs go to ParquetFile.iter_batches, e.g. columns=[...])
+    - Excel formats -> the result of read_file once; workbooks cannot be read
+      incrementally
+    """
+    if file_format is None:
+        file_format = Path(filename).suffix
+    ext = file_format.lower()
+
+    if ext in (".csv", ".tsv", ".txt", ".json"):
+        with read_file(
+            filename, file_format=ext, chunksize=chunk_rows, **kwargs
+        ) as chunks:
+            yield from chunks
+    elif ext in (".parquet", ".pq"):
+        parquet_file = pq.ParquetFile(_with_random_access(filename))
+        yield from parquet_file.iter_batches(batch_size=chunk_rows, **kwargs)
+    else:
+        yield read_file(filename, file_format=ext, **kwargs)
+
+
+def _with_random_access(filename):
+    """Read a file object that cannot seek into memory; paths are returned as is."""
+    if hasattr(filename, "read") and not (
+        hasattr(filename, "seekable") and filename.seekable()
+    ):
+        return io.BytesIO(filename.read())
+    return filename
@@ -0,0 +1,178 @@
+"""Module for appending DataFrames to database tables.
+
+`DataFrame.to_sql` with a chunksize sends batched, parameterized INSERTs, so
+every row is bound, sent and planned as part of a statement. On PostgreSQL
+(psycopg2 or psycopg 3) `append_dataframe_to_sql` instead renders the rows into
+an in-memory CSV buffer and streams it with `COPY ... FROM STDIN`, which the
+server parses in one pass. Other engines fall back to `to_sql`. Table creation
+and type mapping still go through pandas in both cases.
+
+Every append can be recorded in a `LoadReport`, which keeps the rows and
+seconds per table and logs their rows per second.
+"""
+
+import dataclasses
+import io
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+from pandas.core.frame import DataFrame
+
+logger = logging.getLogger(__name__)
+
+# DB-API drivers whose cursors can run COPY ... FROM STDIN
+COPY_DRIVERS = ("psycopg2", "psycopg")
+
+
+@dataclasses.dataclass
+class TableLoad:
+    """Rows appended to one table and the time it took.
+
+    Attributes:
+        rows: Number of rows appended
+        seconds: Wall-clock duration of the appends
+    """
+
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows appended per second."""
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+class LoadReport:
+    """Rows and duration of the appends of a run, per table.
+
+    Attributes:
+        tables: Load of every table, in order of first append
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty report."""
+        self.tables: Dict[str, TableLoad] = {}
+
+    def record(self, table_name: str, rows: int, seconds: float) -> None:
+        """Add one append to the totals of its table.
+
+        Args:
+            table_name: Name of the target table
+            rows: Number of rows appended
+            seconds: Duration of the append
+        """
+        load = self.tables.setdefault(table_name, TableLoad())
+        load.rows += rows
+        load.seconds += seconds
+
+    def log(self) -> None:
+        """Log the rows per second of every table."""
+        for table_name, load in self.tables.items():
+            logger.info(
+                "Loaded %s: %d rows in %.2fs (%.0f rows/s)",
+                table_name,
+                load.rows,
+                load.seconds,
+                load.rows_per_second,
+            )
+
+
+def supports_copy(engine) -> bool:
+    """
+    Whether appends to the engine's database can use COPY.
+
+    Args:
+        engine: SQLAlchemy engine or connection
+
+    Returns:
+        True for PostgreSQL through psycopg2 or psycopg 3
+    """
+    dialect = engine.dialect
+    return dialect.name == "postgresql" and dialect.driver in COPY_DRIVERS
+
+
+def append_dataframe_to_sql(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    data_frame: DataFrame,
+    table_name: str,
+    engine,
+    schema: Optional[str] = None,
+    chunk_size: int = 1000,
+    report: Optional[LoadReport] = None,
+) -> None:
+    """
+    Append DataFrame to SQL database.
+
+    On PostgreSQL the whole DataFrame is sent with one COPY, so callers bound
+    the memory of the CSV buffer by the size of the frames they pass in.
+
+    Args:
+        data_frame: DataFrame to append
+        table_name: Name of the target table
+        engine: SQLAlchemy engine
+        schema: Database schema (optional)
+        chunk_size: Number of rows per INSERT batch when COPY is not available
+        report: Report the rows and duration are recorded in (optional)
+    """
+    use_copy = supports_copy(engine)
+    started = time.perf_counter()
+    data_frame.to_sql(
+        name=table_name,
+        con=engine,
+        schema=schema,
+        if_exists="append",
+        chunksize=None if use_copy else chunk_size,
+        index=False,
+        method=copy_rows if use_copy else None,
+    )
+    if report is not None:
+        report.record(table_name, len(data_frame), time.perf_counter() - started)
+
+
+def copy_rows(table, conn, keys: List[str], data_iter: Iterable[tuple]) -> int:
+    """
+    Insert rows with COPY ... FROM STDIN; a `method` for `DataFrame.to_sql`.
+
+    Args:
+        table: pandas SQLTable being appended to
+        conn: SQLAlchemy connection of the append
+        keys: Column names, in row order
+        data_iter: Rows, with missing values as None
+
+    Returns:
+        Number of rows copied
+    """
+    buffer = io.StringIO()
+    rows = 0
+    for row in data_iter:
+        buffer.write(",".join(map(_csv_value, row)))
+        buffer.write("\n")
+        rows += 1
+    buffer.seek(0)
+
+    preparer = conn.dialect.identifier_preparer
+    target = preparer.quote(table.name)
+    if table.schema:
+        target = f"{preparer.quote_schema(table.schema)}.{target}"
+    columns = ", ".join(preparer.quote(key) for key in keys)
+    statement = f"COPY {target} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+    with conn.connection.cursor() as cursor:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(statement, buffer)
+        else:  # psycopg 3
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+    return rows
+
+
+def _csv_value(value) -> str:
+    """
+    Render one field for COPY's CSV format.
+
+    None is left empty and unquoted, which COPY reads as NULL; every other
+    value is quoted, so empty strings stay empty strings.
+    """
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
@@ -1,19 +1,40 @@
-"""Module for synchronizing data between SFTP server and database."""
+"""Module for synchronizing data between SFTP server and database.
 
+Two ingest modes, selected with SFTP_SYNC_MODE:
+
+- download (default): files are downloaded to var/files/ (in parallel), then
+  read back from disk and loaded;
+- stream: every remote file is read through the SFTP file object with
+  read-ahead and parsed as it arrives, so transfer, parsing and loading overlap
+  and no local copy is written. Excel and Parquet files need random access and
+  are buffered in memory instead.
+
+In both modes files are read with `iter_file` and appended SFTP_CHUNK_ROWS rows
+at a time (Excel workbooks at once), which caps the memory used per file. On
+PostgreSQL every chunk is appended with one COPY (see `sftp_api.sql_loader`);
+the rows per second of every table are logged at the end of the run.
+"""
+
+import logging
 import os
 from pathlib import Path
 from typing import Optional
 
 import pandas as pd
 import paramiko
+import pyarrow as pa  # type: ignore[import-untyped]
 from dotenv import load_dotenv
 from pandas.core.frame import DataFrame
 
+from core.db.instrumentation import query_scope
 from sftp_api.db import engine as ENGINE, DB_SCHEMA
-from sftp_api.file_reader import read_file
+from sftp_api.file_reader import iter_file, read_file
+from sftp_api.sql_loader import LoadReport, append_dataframe_to_sql
 from sftp_api.utils.file_transfer import SftpFileTransfer
+from sftp_api.utils.manifest import Manifest
 
 load_dotenv()
+logging.basicConfig(level=logging.INFO)
 
 # SFTP connection configuration
 HOST = os.getenv("SFTP_API_HOST", "")
@@ -21,6 +42,13 @@ USERNAME = os.getenv("SFTP_API_USERNAME", "")
 PASSWORD = os.getenv("SFTP_API_PASSWORD", "")
 PORT = int(os.getenv("SFTP_API_PORT", "22"))
 
+# Parallel downloads: one SFTP channel per worker on the shared SSH connection
+TRANSFER_WORKERS = int(os.getenv("SFTP_TRANSFER_WORKERS", "4"))
+PREFETCH_REQUESTS = int(os.getenv("SFTP_PREFETCH_REQUESTS", "0")) or None
+
+SYNC_MODE = os.getenv("SFTP_SYNC_MODE", "download")
+CHUNK_ROWS = int(os.getenv("SFTP_CHUNK_ROWS", "100000"))
+
 # Initialize SFTP client
 SSH_CLIENT = paramiko.SSHClient()
 SSH_CLIENT.set_missing_host_key_policy(paramiko.AutoAddPolicy())
@@ -33,18 +61,27 @@ SFTP_CLIENT = SSH_CLIENT.open_sftp()
 # Path configuration
 REMOTE_FILE_PATH = "upload/"
 LOCAL_PATH = "var/files/"
+MANIFEST_PATH = os.getenv("SFTP_MANIFEST_PATH", "var/sftp_manifest.json")
 
 if not os.path.exists(LOCAL_PATH):
     os.makedirs(LOCAL_PATH)
 
+# Remote files already downloaded / ingested by earlier runs
+MANIFEST = Manifest(MANIFEST_PATH)
+
 # Initialize file transfer
 transfer = SftpFileTransfer(
     sftp_client=SFTP_CLIENT,
     remote_base_path=REMOTE_FILE_PATH,
     local_base_path=LOCAL_PATH,
+    client_factory=SSH_CLIENT.open_sftp,
+    workers=TRANSFER_WORKERS,
+    max_concurrent_prefetch_requests=PREFETCH_REQUESTS,
+    manifest=MANIFEST,
 )
 
-transfer.transfer_files()
+# Rows and load time per table of this run
+LOAD_REPORT = LoadReport()
 
 TABLE_NAMES_MAP: dict[str, dict[str, str]] = {
     "department": {"Sheet1": "department"},
@@ -52,15 +89,18 @@ TABLE_NAMES_MAP: dict[str, dict[str, str]] = {
 }
 
 
-def process_department_people(filepath: str, table_name: str) -> None:
+def process_department_people(
+    source, table_name: str, file_format: Optional[str] = None
+) -> None:
     """
     Process department and people data from Excel file.
 
     Args:
-        filepath: Path to the Excel file
+        source: Path to the Excel file, or an open binary file
         table_name: Name of the table to process
+        file_format: Extension of the file; required when source is a file
     """
-    data_frames = read_file(filepath)
+    data_frames = read_file(source, file_format=file_format)
     table_names = TABLE_NAMES_MAP[table_name]
     for sheet, sheet_data_frame in data_frames.items():
         sheet_data_frame.columns = [
@@ -68,7 +108,13 @@ def process_department_people(filepath: str, table_name: str) -> None:
         ]
         sheet_data_frame = sheet_data_frame.rename(columns={"employee_id": "source_id"})
         sheet_data_frame["raw_create_date"] = pd.Timestamp.now()
-        append_dataframe_to_sql(sheet_data_frame, table_names[sheet], ENGINE, DB_SCHEMA)
+        append_dataframe_to_sql(
+            sheet_data_frame,
+            table_names[sheet],
+            ENGINE,
+            DB_SCHEMA,
+            report=LOAD_REPORT,
+        )
 
 
 def get_table_name(filepath: str) -> str:
@@ -84,52 +130,98 @@ def get_table_name(filepath: str) -> str:
     return Path(filepath).stem
 
 
-def append_dataframe_to_sql(
-    data_frame: DataFrame,
-    table_name: str,
-    engine,
-    schema: Optional[str] = None,
-    chunk_size: int = 1000,
-) -> None:
+def prepare_data_frame(data_frame: DataFrame, name: str) -> DataFrame:
     """
-    Append DataFrame to SQL database.
+    Map source columns to the raw table columns and stamp the load time.
 
     Args:
-        data_frame: DataFrame to append
-        table_name: Name of the target table
-        engine: SQLAlchemy engine
-        schema: Database schema (optional)
-        chunk_size: Number of rows to insert at a time
-    """
-    data_frame.to_sql(
-        name=table_name,
-        con=engine,
-        schema=schema,
-        if_exists="append",
-        chunksize=chunk_size,
-        index=False,
-    )
+        data_frame: Rows read from a file
+        name: Name of the target table
 
+    Returns:
+        The DataFrame to append
+    """
+    if name == "ads_click":
+        data_frame = data_frame.rename(columns={"ad_id": "source_id"})
 
-for file in os.listdir(LOCAL_PATH):
-    print(f"Processing file: {file}")
-    FILE_PATH = f"{LOCAL_PATH}{file}"
-
-    df = read_file(FILE_PATH)
+    if name == "revenue_from_ads" or name.startswith("number_of_clicks_"):
+        data_frame = data_frame.rename(columns={"user_id": "source_id"})
 
-    name = get_table_name(FILE_PATH)
+    data_frame["raw_create_date"] = pd.Timestamp.now()
+    return data_frame
 
-    if name == "ads_click":
-        df = df.rename(columns={"ad_id": "source_id"})
 
-    if name == "revenue_from_ads":
-        df = df.rename(columns={"user_id": "source_id"})
+def load_file(source, name: str, file_format: str) -> None:
+    """
+    Load one file into its raw table.
 
-    if name.startswith("number_of_clicks_"):
-        df = df.rename(columns={"user_id": "source_id"})
+    Rows are parsed and appended CHUNK_ROWS at a time; Parquet record batches
+    are converted to DataFrames one by one.
 
+    Args:
+        source: Path to the file, or an open binary file
+        name: Name of the target table
+        file_format: Extension of the file, e.g. ".csv"
+    """
     if name in ("people_in_department_merged", "department"):
-        process_department_people(FILE_PATH, name)
+        process_department_people(source, name, file_format)
+        return
+
+    for chunk in iter_file(source, chunk_rows=CHUNK_ROWS, file_format=file_format):
+        if isinstance(chunk, pa.RecordBatch):
+            chunk = chunk.to_pandas()
+        append_dataframe_to_sql(
+            prepare_data_frame(chunk, name),
+            name,
+            ENGINE,
+            DB_SCHEMA,
+            report=LOAD_REPORT,
+        )
+
+
+def sync_downloaded_files() -> None:
+    """Download changed files to LOCAL_PATH, then load the ones not ingested yet."""
+    try:
+        transfer.transfer_files()
+    finally:
+        MANIFEST.save()
+
+    for file in os.listdir(LOCAL_PATH):
+        remote_path = os.path.join(REMOTE_FILE_PATH, file)
+        if MANIFEST.is_ingested(remote_path):
+            print(f"Skipping file: {file} (already ingested)")
+            continue
+
+        print(f"Processing file: {file}")
+        file_path = f"{LOCAL_PATH}{file}"
+        with query_scope(f"sftp sync {file}"):
+            load_file(file_path, get_table_name(file_path), Path(file_path).suffix)
+
+        MANIFEST.mark_ingested(remote_path)
+        MANIFEST.save()
+
+
+def sync_streamed_files() -> None:
+    """Stream the remote files not ingested yet straight into the loader."""
+    try:
+        for attributes in transfer.remote_files_to_ingest():
+            file = attributes.filename
+            print(f"Streaming file: {file}")
+            with query_scope(f"sftp sync {file}"), transfer.open_remote(
+                attributes
+            ) as remote_file:
+                load_file(remote_file, get_table_name(file), Path(file).suffix)
+
+            MANIFEST.mark_ingested(os.path.join(REMOTE_FILE_PATH, file))
+            MANIFEST.save()
+    finally:
+        SFTP_CLIENT.close()
+
+
+try:
+    if SYNC_MODE == "stream":
+        sync_streamed_files()
     else:
-        df["raw_create_date"] = pd.Timestamp.now()
-        append_dataframe_to_sql(df, name, ENGINE, DB_SCHEMA)
+        sync_downloaded_files()
+finally:
+    LOAD_REPORT.log()
@@ -1,47 +1,347 @@
-"""Module for handling file transfers between SFTP server and local filesystem."""
+"""Module for handling file transfers between SFTP server and local filesystem.
 
+Files are downloaded with paramiko's prefetching reads, which keep many read
+requests in flight instead of waiting for each block. With `workers` > 1 and a
+`client_factory`, files are downloaded in parallel by a thread pool in which
+every worker uses its own SFTP client, so one slow file or one channel's flow
+control window no longer leaves the link idle. Per-file and aggregate
+throughput are logged and returned as `TransferStats`.
+
+With a `Manifest`, the remote directory is listed with `listdir_attr` and files
+whose size and mtime match the last download are skipped; the content of every
+download is hashed while it is written and recorded in the manifest.
+
+For streaming ingest, `open_remote` opens a remote file for reading with
+read-ahead, so the next blocks are on their way while the caller parses and
+loads the current ones; nothing is written to the local filesystem.
+"""
+
+import contextlib
+import dataclasses
+import hashlib
+import io
+import logging
 import os
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, BinaryIO, Callable, Iterator, List, Optional, cast
+
+from paramiko import SFTPAttributes, SFTPClient, SFTPFile
+
+from sftp_api.utils.manifest import Manifest
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class TransferStats:
+    """Outcome of one download.
+
+    Attributes:
+        filename: Name of the file, relative to the base paths
+        size: Bytes written locally
+        seconds: Wall-clock duration of the download
+    """
+
+    filename: str
+    size: int
+    seconds: float
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second."""
+        return self.size / self.seconds if self.seconds > 0 else 0.0
+
+
+class _HashingWriter:  # pylint: disable=too-few-public-methods
+    """File wrapper hashing the bytes written through it."""
 
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.digest = hashlib.sha256()
 
-class SftpFileTransfer:  # pylint: disable=too-few-public-methods
+    def write(self, data: bytes) -> int:
+        """Hash and write a block."""
+        self.digest.update(data)
+        return self.file.write(data)
+
+
+class _HashingReader(io.RawIOBase):
+    """Readable stream hashing the bytes read through it."""
+
+    def __init__(self, file: SFTPFile):
+        super().__init__()
+        self.file = file
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.file.read(len(buffer))
+        buffer[: len(data)] = data
+        self.digest.update(data)
+        self.size += len(data)
+        return len(data)
+
+
+def format_throughput(bytes_per_second: float) -> str:
+    """Render a throughput as MB/s.
+
+    Args:
+        bytes_per_second: Throughput in bytes per second
+
+    Returns:
+        The throughput, e.g. "12.3 MB/s"
+    """
+    return f"{bytes_per_second / 1_000_000:.1f} MB/s"
+
+
+class SftpFileTransfer:
     """Handles file transfers between a remote SFTP server and local filesystem.
 
     Attributes:
         sftp_client: Connected SFTP client instance
         remote_base_path: Base path on the remote SFTP server
         local_base_path: Base path on the local filesystem
+        client_factory: Opens an additional SFTP client for a worker, e.g.
+            `ssh_client.open_sftp` (a new channel on the same SSH connection)
+        workers: Number of files downloaded in parallel
+        max_concurrent_prefetch_requests: Cap on the read requests in flight
+            per file (None: paramiko's default, unbounded)
+        manifest: Manifest used to skip unchanged files (None: download all)
     """
 
-    def __init__(self, sftp_client, remote_base_path, local_base_path):
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        sftp_client: SFTPClient,
+        remote_base_path: str,
+        local_base_path: str,
+        client_factory: Optional[Callable[[], SFTPClient]] = None,
+        workers: int = 1,
+        max_concurrent_prefetch_requests: Optional[int] = None,
+        manifest: Optional[Manifest] = None,
+    ):
         """Initialize the SFTP file transfer handler.
 
         Args:
             sftp_client: Connected SFTP client instance
             remote_base_path: Base path on the remote SFTP server
             local_base_path: Base path on the local filesystem
+            client_factory: Opens an SFTP client per worker; required for
+                parallel downloads
+            workers: Number of files downloaded in parallel
+            max_concurrent_prefetch_requests: Cap on the read requests in
+                flight per file
+            manifest: Manifest used to skip unchanged files
         """
         self.sftp_client = sftp_client
         self.remote_base_path = remote_base_path
         self.local_base_path = local_base_path
+        self.client_factory = client_factory
+        self.workers = workers
+        self.max_concurrent_prefetch_requests = max_concurrent_prefetch_requests
+        self.manifest = manifest
+
+    def transfer_files(self) -> List[TransferStats]:
+        """Transfer all files from remote SFTP directory to local directory.
 
-    def transfer_files(self):
-        """Transfer all files from remote SFTP directory to local directory."""
+        Returns:
+            The statistics of every download, in directory listing order;
+            files skipped as unchanged are not included
+        """
         try:
-            list_of_files = self.sftp_client.listdir(self.remote_base_path)
+            list_of_files = self._pending_files(keep_staged=True)
 
-            for file in list_of_files:
-                self._transfer_single_file(file)
+            started = time.perf_counter()
+            if self.workers > 1 and self.client_factory is not None:
+                results = self._transfer_parallel(list_of_files, self.client_factory)
+            else:
+                results = [
+                    self._transfer_single_file(self.sftp_client, file)
+                    for file in list_of_files
+                ]
+            self._report(results, time.perf_counter() - started)
+            return results
 
         finally:
             self.sftp_client.close()
 
-    def _transfer_single_file(self, filename):
+    def remote_files_to_ingest(self) -> List[SFTPAttributes]:
+        """List the remote files whose current content has not been ingested.
+
+        Returns:
+            Remote attributes of the files, in directory listing order
+        """
+        return self._pending_files(keep_staged=False)
+
+    @contextlib.contextmanager
+    def open_remote(
+        self, attributes: SFTPAttributes, buffer_size: int = 1024 * 1024
+    ) -> Iterator[BinaryIO]:
+        """Open a remote file for streaming reads with read-ahead.
+
+        The whole file is requested up front (paramiko prefetch), and reads
+        are served from the blocks received so far. When the block exits
+        normally, the rest of the file is read and its size, mtime and content
+        hash are recorded in the manifest; marking it ingested is up to the
+        caller.
+
+        Args:
+            attributes: Remote attributes of the file, from `listdir_attr`
+            buffer_size: Size of the read buffer handed to the parsers
+
+        Yields:
+            A buffered binary stream of the remote file
+        """
+        remote_path = os.path.join(self.remote_base_path, attributes.filename)
+        with self.sftp_client.open(remote_path, "rb") as remote_file:
+            remote_file.prefetch(
+                attributes.st_size,
+                max_concurrent_requests=self.max_concurrent_prefetch_requests,
+            )
+            reader = _HashingReader(remote_file)
+            stream = io.BufferedReader(reader, buffer_size=buffer_size)
+            yield cast(BinaryIO, stream)
+
+            while stream.read(buffer_size):
+                pass
+            if self.manifest is not None:
+                self.manifest.record_download(
+                    remote_path,
+                    attributes.st_size or reader.size,
+                    attributes.st_mtime or 0,
+                    reader.digest.hexdigest(),
+                )
+
+    def _pending_files(self, keep_staged: bool) -> List[SFTPAttributes]:
+        """List the regular files of the remote directory still to process.
+
+        Args:
+            keep_staged: Also skip files whose unchanged local copy still
+                awaits ingestion (download mode)
+        """
+        files = [
+            attributes
+            for attributes in self.sftp_client.listdir_attr(self.remote_base_path)
+            if not stat.S_ISDIR(attributes.st_mode or 0)
+        ]
+        if self.manifest is None:
+            return files
+
+        manifest = self.manifest
+        changed = [
+            file
+            for file in files
+            if not self._is_unchanged(manifest, file, keep_staged)
+        ]
+        if len(changed) < len(files):
+            logger.info("Skipping %d unchanged file(s)", len(files) - len(changed))
+        return changed
+
+    def _is_unchanged(
+        self, manifest: Manifest, attributes: SFTPAttributes, keep_staged: bool
+    ) -> bool:
+        """Whether a file is in the manifest as processed and still current.
+
+        A file that was downloaded but not ingested yet only counts as
+        unchanged in download mode, and only while its local copy is there.
+        """
+        remote_path = os.path.join(self.remote_base_path, attributes.filename)
+        local_path = os.path.join(self.local_base_path, attributes.filename)
+        if not manifest.is_unchanged(
+            remote_path, attributes.st_size or 0, attributes.st_mtime or 0
+        ):
+            return False
+        return manifest.is_ingested(remote_path) or (
+            keep_staged and os.path.exists(local_path)
+        )
+
+    def _transfer_parallel(
+        self, files: List[SFTPAttributes], client_factory: Callable[[], SFTPClient]
+    ) -> List[TransferStats]:
+        """Download files on a thread pool, one SFTP client per worker thread.
+
+        Args:
+            files: Remote attributes of the files to transfer
+            client_factory: Opens the client of a worker thread
+        """
+        local = threading.local()
+        opened: List[SFTPClient] = []
+        opened_lock = threading.Lock()
+
+        def worker_client() -> SFTPClient:
+            if not hasattr(local, "client"):
+                local.client = client_factory()
+                with opened_lock:
+                    opened.append(local.client)
+            return local.client
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                return list(
+                    pool.map(
+                        lambda file: self._transfer_single_file(worker_client(), file),
+                        files,
+                    )
+                )
+        finally:
+            for client in opened:
+                client.close()
+
+    def _transfer_single_file(
+        self, sftp_client: SFTPClient, attributes: SFTPAttributes
+    ) -> TransferStats:
         """Transfer a single file from remote to local.
 
         Args:
-            filename: Name of the file to transfer
+            sftp_client: Client used for the download
+            attributes: Remote attributes of the file to transfer
+
+        Returns:
+            Size and duration of the download
         """
+        filename = attributes.filename
         remote_path = os.path.join(self.remote_base_path, filename)
         local_path = os.path.join(self.local_base_path, filename)
 
-        self.sftp_client.get(remote_path, local_path)
+        started = time.perf_counter()
+        with open(local_path, "wb") as local_file:
+            writer = _HashingWriter(local_file)
+            size = sftp_client.getfo(
+                remote_path,
+                cast(IO[bytes], writer),  # getfo only calls write()
+                prefetch=True,
+                max_concurrent_prefetch_requests=self.max_concurrent_prefetch_requests,
+            )
+        stats = TransferStats(filename, size, time.perf_counter() - started)
+        if self.manifest is not None:
+            self.manifest.record_download(
+                remote_path,
+                attributes.st_size or size,
+                attributes.st_mtime or 0,
+                writer.digest.hexdigest(),
+            )
+        logger.info(
+            "Downloaded %s: %d bytes in %.2fs (%s)",
+            filename,
+            stats.size,
+            stats.seconds,
+            format_throughput(stats.throughput),
+        )
+        return stats
+
+    def _report(self, results: List[TransferStats], elapsed: float) -> None:
+        """Log the aggregate throughput of a transfer run."""
+        total = sum(stats.size for stats in results)
+        logger.info(
+            "Downloaded %d files, %d bytes in %.2fs with %d worker(s) (%s)",
+            len(results),
+            total,
+            elapsed,
+            self.workers if self.client_factory is not None else 1,
+            format_throughput(total / elapsed if elapsed > 0 else 0.0),
+        )
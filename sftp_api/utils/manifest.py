@@ -0,0 +1,109 @@
+"""Manifest of the remote files already downloaded and ingested.
+
+The manifest is a JSON file mapping each remote path to the size and mtime
+reported by the server, the SHA-256 of its content and whether it has been
+loaded into the database. `SftpFileTransfer` compares it with `listdir_attr`
+to skip files that did not change since the last download, and the load loop
+skips files whose content was already ingested, so a sync run only costs as
+much as the new data. A file that is re-uploaded with a new mtime but the same
+content is downloaded again but not appended a second time.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict
+
+
+class Manifest:
+    """Persisted remote-stat manifest, safe to update from several threads.
+
+    Attributes:
+        path: Location of the JSON file
+    """
+
+    def __init__(self, path: str):
+        """Load the manifest, starting empty when the file does not exist yet.
+
+        Args:
+            path: Location of the JSON file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as manifest_file:
+                self._entries = json.load(manifest_file)
+
+    def is_unchanged(self, remote_path: str, size: int, mtime: int) -> bool:
+        """Whether the remote file has the size and mtime of the last download.
+
+        Args:
+            remote_path: Path of the file on the SFTP server
+            size: Size reported by the server
+            mtime: Modification time reported by the server
+
+        Returns:
+            True if the file was downloaded before and has not changed since
+        """
+        with self._lock:
+            entry = self._entries.get(remote_path)
+        return entry is not None and (entry["size"], entry["mtime"]) == (size, mtime)
+
+    def record_download(
+        self, remote_path: str, size: int, mtime: int, sha256: str
+    ) -> None:
+        """Store the stat and content hash of a downloaded file.
+
+        The ingested flag is kept when the content is unchanged and reset
+        otherwise.
+
+        Args:
+            remote_path: Path of the file on the SFTP server
+            size: Size reported by the server
+            mtime: Modification time reported by the server
+            sha256: Hex digest of the downloaded content
+        """
+        with self._lock:
+            previous = self._entries.get(remote_path, {})
+            self._entries[remote_path] = {
+                "size": size,
+                "mtime": mtime,
+                "sha256": sha256,
+                "ingested": previous.get("sha256") == sha256
+                and previous.get("ingested", False),
+            }
+
+    def is_ingested(self, remote_path: str) -> bool:
+        """Whether the current content of a file has been loaded.
+
+        Args:
+            remote_path: Path of the file on the SFTP server
+
+        Returns:
+            True if the file was loaded since its content last changed
+        """
+        with self._lock:
+            return self._entries.get(remote_path, {}).get("ingested", False)
+
+    def mark_ingested(self, remote_path: str) -> None:
+        """Record that a downloaded file has been loaded; unknown paths are ignored.
+
+        Args:
+            remote_path: Path of the file on the SFTP server
+        """
+        with self._lock:
+            if remote_path in self._entries:
+                self._entries[remote_path]["ingested"] = True
+
+    def save(self) -> None:
+        """Write the manifest atomically, so a crash never leaves it truncated."""
+        with self._lock:
+            content = json.dumps(self._entries, indent=2, sort_keys=True)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as manifest_file:
+            manifest_file.write(content)
+        os.replace(temporary_path, self.path)
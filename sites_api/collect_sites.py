@@ -29,6 +29,7 @@ import os
 
 from dotenv import load_dotenv
 
+from core.db.instrumentation import query_scope
 from sites_api.clients.sites_api_client import SitesAPIClient
 from sites_api.db import SessionLocal
 from sites_api.models import Sites
@@ -52,34 +53,35 @@ client.signup("Testina Testowa", "testina.testowa@test.com", "mypassword")
 # Get all sites (warning: might be a lot of data!)
 all_sites = client.get_all_sites()
 
-for site in all_sites:
-    source_id = site["id"]
-
-    site_model = session.query(Sites).filter_by(source_id=source_id).first()
-
-    # Common fields to update
-    site_attributes = {
-        "name": site["name"],
-        "cid": site["cid"],
-        "manager": site["manager"],
-        "submanager": site["submanager"],
-        "state": site["state"],
-        "host": bool(site["host"]),
-        "devteam": site["devteam"],
-        "lifetime": site["lifetime"],
-        "url": site["url"],
-    }
-
-    if site_model is None:
-        # Create new site with all attributes including source_id
-        site_model = Sites(source_id=source_id, **site_attributes)
-    else:
-        # Update existing site
-        for attr, value in site_attributes.items():
-            setattr(site_model, attr, value)
-
-    session.add(site_model)
-    session.commit()
+with query_scope("collect_sites"):
+    for site in all_sites:
+        source_id = site["id"]
+
+        site_model = session.query(Sites).filter_by(source_id=source_id).first()
+
+        # Common fields to update
+        site_attributes = {
+            "name": site["name"],
+            "cid": site["cid"],
+            "manager": site["manager"],
+            "submanager": site["submanager"],
+            "state": site["state"],
+            "host": bool(site["host"]),
+            "devteam": site["devteam"],
+            "lifetime": site["lifetime"],
+            "url": site["url"],
+        }
+
+        if site_model is None:
+            # Create new site with all attributes including source_id
+            site_model = Sites(source_id=source_id, **site_attributes)
+        else:
+            # Update existing site
+            for attr, value in site_attributes.items():
+                setattr(site_model, attr, value)
+
+        session.add(site_model)
+        session.commit()
 
 session.close()
 print("End collect sites process")